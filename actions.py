@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import random
 import math
 from typing import Optional, Tuple, TYPE_CHECKING
 
@@ -8,11 +7,15 @@ import color
 import exceptions
 import enchant_types
 from render_functions import get_names_at_location
+import tile_types
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Actor, Entity, Item
 
+# How far away dormant monsters can hear a fight.
+COMBAT_NOISE_RADIUS = 4
+
 class Action:
     def __init__(self, entity: Actor) -> None:
         super().__init__()
@@ -45,12 +48,13 @@ class PickupAction(Action):
         actor_location_y = self.entity.y
         inventory = self.entity.inventory
 
-        for item in self.engine.game_map.items:
-            if actor_location_x == item.x and actor_location_y == item.y:
+        game_map = self.engine.game_map
+        for item in game_map.get_entities_at_location(actor_location_x, actor_location_y):
+            if item in game_map.items:
                 if len(inventory.sorted_stacked_items) >= inventory.capacity:
                     raise exceptions.Impossible("Your inventory is full.")
 
-                self.engine.game_map.entities.remove(item)
+                game_map.remove_entity(item)
                 item.parent = self.entity.inventory
                 inventory.items.append(item)
 
@@ -140,10 +144,12 @@ class MeleeAction(ActionWithDirection):
         if not target:
             raise exceptions.Impossible("Nothing to attack.")
 
+        self.engine.game_map.make_noise(target.x, target.y, COMBAT_NOISE_RADIUS)
+
         if self.entity.equipment.weapon:
-            damage = random.randint(self.entity.equipment.min_damage, self.entity.equipment.max_damage)
+            damage = self.engine.rng.combat.randint(self.entity.equipment.min_damage, self.entity.equipment.max_damage)
         else:
-            damage = random.randint(self.entity.fighter.unarmed_min_damage, self.entity.fighter.unarmed_max_damage)
+            damage = self.engine.rng.combat.randint(self.entity.fighter.unarmed_min_damage, self.entity.fighter.unarmed_max_damage)
 
         final_damage = int(math.ceil(damage * (100/(100 + target.fighter.defense))))
 
@@ -184,7 +190,7 @@ class MovementAction(ActionWithDirection):
         if not self.engine.game_map.in_bounds(dest_x, dest_y):
             # Destination is out of bounds.
             raise exceptions.Impossible("That way is blocked.")
-        if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
+        if not tile_types.walkable[self.engine.game_map.tiles[dest_x, dest_y]]:
             # Destination is blocked by a tile.
             raise exceptions.Impossible("That way is blocked.")
         if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
@@ -193,9 +199,7 @@ class MovementAction(ActionWithDirection):
 
         
         if self.entity == self.engine.player:
-            names = ", ".join(
-                entity.name for entity in self.engine.game_map.entities if entity.x == self.entity.x + self.dx and entity.y == self.entity.y + self.dy
-            )
+            names = ", ".join(self.engine.game_map.get_names_at_location(dest_x, dest_y))
             if names:
                 self.engine.message_log.add_message(
                     "You see here: " + names, color.white
@@ -0,0 +1,6 @@
+from enum import auto, Enum
+
+class AwarenessState(Enum):
+    SLEEPING = auto()  # Only noise or damage will wake it.
+    IDLE = auto()  # Also wakes when it comes into view.
+    HUNTING = auto()
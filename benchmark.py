@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Run the game without a window and report how fast the engine simulates turns."""
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+import tcod
+
+import actions
+from actions import Action
+from engine import Engine
+from game_map import GameMap, GameWorld
+import input_handlers
+import setup_game
+
+COMMAND_DIRECTIONS = {
+    "h": (-1, 0),
+    "j": (0, 1),
+    "k": (0, -1),
+    "l": (1, 0),
+    "y": (-1, -1),
+    "u": (1, -1),
+    "b": (-1, 1),
+    "n": (1, 1),
+}
+
+
+def random_actions(engine: Engine) -> Iterator[Action]:
+    """Wander randomly, picking things up and taking the stairs down when standing on them."""
+    while True:
+        player = engine.player
+        if (player.x, player.y) == engine.game_map.downstairs_location:
+            yield actions.DownStairsAction(player)
+        elif random.random() < 0.05:
+            yield actions.PickupAction(player)
+        else:
+            yield actions.BumpAction(player, *random.choice(list(COMMAND_DIRECTIONS.values())))
+
+
+def dive_actions(engine: Engine) -> Iterator[Action]:
+    """Head straight for the stairs down on every floor, fighting anything in the way."""
+    while True:
+        player = engine.player
+        stairs = engine.game_map.downstairs_location
+        if (player.x, player.y) == stairs:
+            yield actions.DownStairsAction(player)
+            continue
+
+        path = player.ai.get_path_to(*stairs)
+        if not path:
+            yield actions.WaitAction(player)
+            continue
+
+        dest_x, dest_y = path[0]
+        yield actions.BumpAction(player, dest_x - player.x, dest_y - player.y)
+
+
+def scripted_actions(engine: Engine, script: str) -> Iterator[Action]:
+    """Replay a script of vi-key moves, "." to wait, "g" to pick up and ">" to descend."""
+    commands = [command for command in script if not command.isspace()]
+    if not commands:
+        raise SystemExit("The script has no commands in it.")
+
+    while True:
+        for command in commands:
+            player = engine.player
+            if command in COMMAND_DIRECTIONS:
+                yield actions.BumpAction(player, *COMMAND_DIRECTIONS[command])
+            elif command == ".":
+                yield actions.WaitAction(player)
+            elif command == "g":
+                yield actions.PickupAction(player)
+            elif command == ">":
+                yield actions.DownStairsAction(player)
+            else:
+                raise SystemExit(f"Unknown script command: {command!r}")
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Return the given percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def time_floor_generation(floor_times: Dict[int, List[float]]) -> None:
+    """Record how long GameWorld.build_floor takes for each floor.
+
+    Floors are timed on whichever thread builds them, so this still measures generation when
+    it happens in the background instead of on the turn which takes the stairs.
+    """
+    build_floor = GameWorld.build_floor
+
+    def timed_build_floor(self: GameWorld, floor: int) -> GameMap:
+        start = time.perf_counter()
+        game_map = build_floor(self, floor)
+        floor_times.setdefault(floor, []).append(time.perf_counter() - start)
+        return game_map
+
+    GameWorld.build_floor = timed_build_floor  # type: ignore
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=5000, help="number of turns to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument(
+        "--strategy",
+        choices=["random", "dive"],
+        default="dive",
+        help="how the player picks actions when no script is given",
+    )
+    parser.add_argument("--script", help="file of commands to replay instead of a strategy")
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="also render every turn onto an offscreen console",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="also report memory used by the game, which slows the simulation down",
+    )
+    parser.add_argument(
+        "--no-pregenerate",
+        action="store_true",
+        help="generate floors on the turn that takes the stairs instead of in the background",
+    )
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = f.read()
+
+    console = None
+    if args.render:
+        console = tcod.console.Console(80, 50, order="F")
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        # Dying deletes "savegame.sav", so keep the run away from any real save game.
+        cwd = os.getcwd()
+        os.chdir(scratch_dir)
+        try:
+            run(args, script, console)
+        finally:
+            os.chdir(cwd)
+
+
+def run(args: argparse.Namespace, script: Optional[str], console: Optional[tcod.console.Console]) -> None:
+    """Play games back to back until enough turns have passed, then print the timings."""
+    floor_times: Dict[int, List[float]] = {}
+    time_floor_generation(floor_times)
+    latencies: List[float] = []
+    games = 0
+    turns = 0
+    elapsed = 0.0
+
+    if args.memory:
+        tracemalloc.start()
+
+    while turns < args.turns:
+        engine = setup_game.new_game(
+            None if args.seed is None else args.seed + games,
+            pregenerate_floors=not args.no_pregenerate,
+        )
+        games += 1
+        handler = input_handlers.MainGameEventHandler(engine)
+        if script is not None:
+            action_stream = scripted_actions(engine, script)
+        elif args.strategy == "random":
+            action_stream = random_actions(engine)
+        else:
+            action_stream = dive_actions(engine)
+
+        while turns < args.turns and engine.player.is_alive and not engine.win:
+            action = next(action_stream)
+
+            start = time.perf_counter()
+            took_turn = handler.handle_action(action)
+            if console is not None:
+                console.clear()
+                handler.on_render(console)
+            duration = time.perf_counter() - start
+            elapsed += duration
+
+            if took_turn:
+                turns += 1
+                latencies.append(duration)
+
+    latencies.sort()
+    print(f"games: {games}, turns: {turns}, time: {elapsed:.3f}s")
+    print(f"turns/sec: {turns / elapsed if elapsed else 0.0:.1f}")
+    print(
+        f"turn latency: p50 {percentile(latencies, 50) * 1000:.3f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.3f} ms"
+    )
+    for floor, times in sorted(floor_times.items()):
+        print(
+            f"floor {floor}: generated {len(times)}x, "
+            f"mean {sum(times) / len(times) * 1000:.2f} ms"
+        )
+
+    if args.memory:
+        # Only the last game is still alive, so this is what it holds in memory.
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"memory: current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB")
+        print(f"save size: {len(pickle.dumps(engine)) / 1024:.0f} KiB uncompressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,108 @@
 from __future__ import annotations
 
-import random
+import copy
 from typing import List, Optional, Tuple, TYPE_CHECKING
 
-import numpy as np  # type: ignore
-import tcod
-
 from actions import Action, BumpAction, MeleeAction, MovementAction, WaitAction
+from awareness_states import AwarenessState
 
 if TYPE_CHECKING:
     from entity import Actor
 
+DIRECTIONS = [
+    (-1, -1),  # Northwest
+    (0, -1),  # North
+    (1, -1),  # Northeast
+    (-1, 0),  # West
+    (1, 0),  # East
+    (-1, 1),  # Southwest
+    (0, 1),  # South
+    (1, 1),  # Southeast
+]
+
 class BaseAI(Action):
+    awareness = AwarenessState.HUNTING
+
     def perform(self) -> None:
         raise NotImplementedError()
 
+    def clone(self, entity: Actor) -> BaseAI:
+        """Return a copy of this AI controlling `entity`."""
+        clone = copy.copy(self)
+        clone.entity = entity
+        return clone
+
+    @property
+    def is_dormant(self) -> bool:
+        """Dormant actors are left out of the turn loop until something wakes them."""
+        return self.awareness is not AwarenessState.HUNTING
+
+    def wake(self) -> None:
+        """Start hunting, putting this actor back into the turn loop if it had dropped out."""
+        self.awareness = AwarenessState.HUNTING
+        scheduler = self.entity.gamemap.scheduler
+        if self.entity is not self.engine.player and self.entity not in scheduler:
+            scheduler.add(self.entity)
+
+    def rest(self) -> None:
+        """Go idle and drop out of the turn loop until woken again."""
+        self.awareness = AwarenessState.IDLE
+        self.entity.gamemap.scheduler.remove(self.entity)
+
+    def hear_noise(self, x: int, y: int) -> None:
+        """Called when a noise at (x, y) reaches this dormant actor."""
+        self.wake()
+
+    def get_step_towards_player(self) -> Optional[Tuple[int, int]]:
+        """Return the (dx, dy) step down the engine's flow field towards the player.
+
+        Only steps onto open tiles which are strictly closer to the player are taken, so a
+        monster blocked by others waits its turn rather than stepping aside or back.  If there
+        is no such step then returns None.
+        """
+        flow_field = self.engine.get_flow_field()
+        gamemap = self.entity.gamemap
+        x, y = self.entity.x, self.entity.y
+
+        best_distance = flow_field[x, y]
+        best_step = None
+        for dx, dy in DIRECTIONS:
+            dest_x, dest_y = x + dx, y + dy
+            if not gamemap.in_bounds(dest_x, dest_y):
+                continue
+            if flow_field[dest_x, dest_y] < best_distance:
+                if not gamemap.get_blocking_entity_at_location(dest_x, dest_y):
+                    best_distance = flow_field[dest_x, dest_y]
+                    best_step = dx, dy
+
+        return best_step
+
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         """Compute and return a path to the target position.
 
         If there is no valid path then returns an empty list.
         """
-        # Copy the walkable array.
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype=np.int8)
-
-        for entity in self.entity.gamemap.entities:
-            # Check that an enitiy blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                cost[entity.x, entity.y] += 10
-
-        # Create a graph from the cost array and pass that graph to a new pathfinder.
-        graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
-        pathfinder = tcod.path.Pathfinder(graph)
-
-        pathfinder.add_root((self.entity.x, self.entity.y))  # Start position.
-
-        # Compute the path to the destination and remove the starting point.
-        path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
-
-        # Convert from List[List[int]] to List[Tuple[int, int]].
-        return [(index[0], index[1]) for index in path]
+        return self.entity.gamemap.pathfinding.path_to(
+            (self.entity.x, self.entity.y), (dest_x, dest_y)
+        )
 
 class HostileEnemy(BaseAI):
     def __init__(self, entity: Actor):
         super().__init__(entity)
         self.path: List[Tuple[int, int]] = []
+        self.last_seen_target: Optional[Tuple[int, int]] = None
+        self.awareness = AwarenessState.IDLE
+
+    def clone(self, entity: Actor) -> HostileEnemy:
+        clone = super().clone(entity)
+        clone.path = list(self.path)
+        return clone
+
+    def hear_noise(self, x: int, y: int) -> None:
+        # Go and investigate where the noise came from.
+        self.path = []
+        self.last_seen_target = x, y
+        self.wake()
 
     def perform(self) -> None:
         target = self.engine.player
@@ -59,7 +114,19 @@ class HostileEnemy(BaseAI):
             if distance <= 1:
                 return MeleeAction(self.entity, dx, dy).perform()
 
-            self.path = self.get_path_to(target.x, target.y)
+            self.path = []
+            self.last_seen_target = target.x, target.y
+
+            step = self.get_step_towards_player()
+            if step:
+                return MovementAction(self.entity, *step).perform()
+
+            return WaitAction(self.entity).perform()
+
+        if self.last_seen_target:
+            # The player slipped out of view, so head to where they were last seen.
+            self.path = self.get_path_to(*self.last_seen_target)
+            self.last_seen_target = None
 
         if self.path:
             dest_x, dest_y = self.path.pop(0)
@@ -67,7 +134,8 @@ class HostileEnemy(BaseAI):
                 self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
             ).perform()
 
-        return WaitAction(self.entity).perform()
+        # Nothing left to chase.
+        self.rest()
 
 class ConfusedEnemy(BaseAI):
     """
@@ -83,6 +151,12 @@ class ConfusedEnemy(BaseAI):
         self.previous_ai = previous_ai
         self.turns_remaining = turns_remaining
 
+    def clone(self, entity: Actor) -> ConfusedEnemy:
+        clone = super().clone(entity)
+        if self.previous_ai:
+            clone.previous_ai = self.previous_ai.clone(entity)
+        return clone
+
     def perform(self) -> None:
         # Revert the AI back to the original state if the effect has run its course.
         if self.turns_remaining <= 0:
@@ -90,20 +164,11 @@ class ConfusedEnemy(BaseAI):
                 f"The {self.entity.name} is no longer confused."
             )
             self.entity.ai = self.previous_ai
+            if self.previous_ai:
+                self.previous_ai.wake()
         else:
             # Pick a random direction
-            direction_x, direction_y = random.choice(
-                [
-                    (-1, -1),  # Northwest
-                    (0, -1),  # North
-                    (1, -1),  # Northeast
-                    (-1, 0),  # West
-                    (1, 0),  # East
-                    (-1, 1),  # Southwest
-                    (0, 1),  # South
-                    (1, 1),  # Southeast
-                ]
-            )
+            direction_x, direction_y = self.engine.rng.ai.choice(DIRECTIONS)
 
             self.turns_remaining -= 1
 
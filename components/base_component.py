@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import copy
+from typing import TypeVar, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
     from game_map import GameMap
 
+T = TypeVar("T", bound="BaseComponent")
+
 class BaseComponent:
+    __slots__ = ("parent",)
+
     parent: Entity  # Owning entity instance.
 
     @property
@@ -17,3 +22,13 @@ class BaseComponent:
     @property
     def engine(self) -> Engine:
         return self.gamemap.engine
+
+    def clone(self: T, parent: Entity) -> T:
+        """Return a copy of this component belonging to `parent`.
+
+        The copy is shallow, so the definition data is shared with the original.  Components
+        with mutable state of their own extend this to copy that state too.
+        """
+        clone = copy.copy(self)
+        clone.parent = parent
+        return clone
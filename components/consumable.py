@@ -14,6 +14,8 @@ if TYPE_CHECKING:
     from entity import Actor, Item
 
 class Consumable(BaseComponent):
+    __slots__ = ()
+
     parent: Item
 
     def get_action(self, consumer: Actor) -> Optional[ActionOrHandler]:
@@ -35,6 +37,8 @@ class Consumable(BaseComponent):
             inventory.items.remove(entity)
 
 class HealingConsumable(Consumable):
+    __slots__ = ("amount", "empowered")
+
     def __init__(self, amount: int, empowered: int):
         self.amount = amount
         self.empowered = empowered
@@ -76,6 +80,8 @@ class HealingConsumable(Consumable):
         return "(Q)uaff"
 
 class ManaConsumable(Consumable):
+    __slots__ = ("amount",)
+
     def __init__(self, amount: int):
         self.amount = amount
 
@@ -104,6 +110,8 @@ class ManaConsumable(Consumable):
         return "(Q)uaff"
 
 class LightningDamageConsumable(Consumable):
+    __slots__ = ("damage", "maximum_range")
+
     def __init__(self, damage: int, maximum_range: int):
         self.damage = damage
         self.maximum_range = maximum_range
@@ -140,6 +148,8 @@ class LightningDamageConsumable(Consumable):
         return "(R)ead"
 
 class ConfusionConsumable(Consumable):
+    __slots__ = ("number_of_turns",)
+
     def __init__(self, number_of_turns: int):
         self.number_of_turns = number_of_turns
 
@@ -170,6 +180,7 @@ class ConfusionConsumable(Consumable):
         target.ai = components.ai.ConfusedEnemy(
             entity=target, previous_ai=target.ai, turns_remaining=self.number_of_turns,
         )
+        target.ai.wake()
         self.consume()
 
     @property
@@ -182,6 +193,8 @@ class ConfusionConsumable(Consumable):
         return "(R)ead"
 
 class BlinkConsumable(Consumable):
+    __slots__ = ()
+
     def get_action(self, consumer: Actor) -> SingleRangedAttackHandler:
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
@@ -207,8 +220,7 @@ class BlinkConsumable(Consumable):
             f"You blink a short distance!",
             color.status_effect_applied,
         )
-        consumer.x = target_xy[0]
-        consumer.y = target_xy[1]
+        consumer.place(*target_xy)
         self.consume()
 
     @property
@@ -221,6 +233,8 @@ class BlinkConsumable(Consumable):
         return "(R)ead"
 
 class FireballDamageConsumable(Consumable):
+    __slots__ = ("damage", "radius")
+
     def __init__(self, damage: int, radius: int):
         self.damage = damage
         self.radius = radius
@@ -242,7 +256,8 @@ class FireballDamageConsumable(Consumable):
             raise Impossible("You cannot target an area that you cannot see.")
 
         targets_hit = False
-        for actor in self.engine.game_map.actors:
+        # Copied, since actors which die in the blast leave the set of living actors.
+        for actor in list(self.engine.game_map.actors):
             if actor.distance(*target_xy) <= self.radius:
                 self.engine.message_log.add_message(
                     f"The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!"
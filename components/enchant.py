@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import random
-
 import color
 import actions
 from exceptions import Impossible
 from components.base_component import BaseComponent
 from enchant_types import EnchantType
 from input_handlers import AreaMeleeAttackHandler, BeemRangedAttackHandler, SingleRangedAttackHandler
+import tile_types
 
 class Enchant(BaseComponent):
+    __slots__ = ("enchant_type",)
+
     parent: Item
 
     def __init__(
@@ -19,6 +20,8 @@ class Enchant(BaseComponent):
         self.enchant_type = enchant_type
 
 class HPEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.HP)
         self.bonus = bonus
@@ -30,6 +33,8 @@ class HPEnchant(Enchant):
         return description
 
 class MPEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.MP)
         self.bonus = bonus
@@ -41,6 +46,8 @@ class MPEnchant(Enchant):
         return description
 
 class STREnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.STR)
         self.bonus = bonus
@@ -52,6 +59,8 @@ class STREnchant(Enchant):
         return description
 
 class INTEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.INT)
         self.bonus = bonus
@@ -63,6 +72,8 @@ class INTEnchant(Enchant):
         return description
 
 class DEXEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.DEX)
         self.bonus = bonus
@@ -74,6 +85,8 @@ class DEXEnchant(Enchant):
         return description
 
 class CONEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.CON)
         self.bonus = bonus
@@ -85,6 +98,8 @@ class CONEnchant(Enchant):
         return description
 
 class DamageEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.DAMAGE)
         self.bonus = bonus
@@ -96,6 +111,8 @@ class DamageEnchant(Enchant):
         return description
 
 class DefenseEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.DEFENSE)
         self.bonus = bonus
@@ -107,6 +124,8 @@ class DefenseEnchant(Enchant):
         return description
 
 class LeechEnchant(Enchant):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int) -> None:
         super().__init__(enchant_type=EnchantType.LEECH)
         self.bonus = bonus
@@ -118,6 +137,8 @@ class LeechEnchant(Enchant):
         return description
 
 class EnchantAbility(Enchant):
+    __slots__ = ("level", "name", "mana")
+
     def __init__(self, name: str, mana: int) -> None:
         super().__init__(enchant_type=EnchantType.ABILITY)
         self.level = 1
@@ -137,6 +158,8 @@ class EnchantAbility(Enchant):
             user.fighter.use_mp(self.mana)
 
 class Whirlwind(EnchantAbility):
+    __slots__ = ("radius",)
+
     def __init__(self) -> None:
         super().__init__(
             name="Whirlwind",
@@ -176,6 +199,8 @@ class Whirlwind(EnchantAbility):
                 target.fighter.take_damage(damage)
 
 class LightningBolt(EnchantAbility):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(
             name="Lightning Bolt",
@@ -210,6 +235,8 @@ class LightningBolt(EnchantAbility):
                 )
 
 class ShadowStrike(EnchantAbility):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(
             name="Shadow Strike",
@@ -248,16 +275,15 @@ class ShadowStrike(EnchantAbility):
             teleport_options = []
             for x in range(start_x, stop_x + 1):
                 for y in range(start_y, stop_y + 1):
-                    if self.engine.game_map.tiles["walkable"][x, y]:
+                    if tile_types.walkable[self.engine.game_map.tiles[x, y]]:
                         if not self.engine.game_map.get_actor_at_location(x, y):
                             teleport_options.append([x, y])
 
             if not teleport_options:
                 raise Impossible("No empty tile to teleport to.")
 
-            teleport_to = random.choice(teleport_options)
-            self.engine.player.x = teleport_to[0]
-            self.engine.player.y = teleport_to[1]
+            teleport_to = self.engine.rng.combat.choice(teleport_options)
+            self.engine.player.place(teleport_to[0], teleport_to[1])
 
             target.fighter.take_damage(damage)
             self.engine.message_log.add_message(
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
     from entity import Actor, Item
 
 class Equipment(BaseComponent):
+    __slots__ = ("weapon", "armor", "hands", "pants", "shoes", "head")
+
     parent: Actor
 
     def __init__(self, weapon: Optional[Item] = None, armor: Optional[Item] = None, hands: Optional[Item] = None, pants: Optional[Item] = None, shoes: Optional[Item] = None, head: Optional[Item] = None):
@@ -20,6 +22,16 @@ class Equipment(BaseComponent):
         self.shoes = shoes
         self.head = head
 
+    def clone(self, parent: Actor) -> Equipment:
+        """Return a copy of this equipment, wearing the matching items of `parent`'s inventory."""
+        clone = super().clone(parent)
+        for slot in ("weapon", "armor", "hands", "pants", "shoes", "head"):
+            item = getattr(self, slot)
+            if item is not None:
+                index = self.parent.inventory.items.index(item)
+                setattr(clone, slot, parent.inventory.items[index])
+        return clone
+
     @property
     def enchants(self) -> List:
         my_enchants = []
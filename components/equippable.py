@@ -1,8 +1,6 @@
 from __future__ import annotations
 
-import random
 import math
-import copy
 from typing import TYPE_CHECKING
 
 import color
@@ -16,6 +14,8 @@ if TYPE_CHECKING:
     from entity import Item
 
 class Equippable(BaseComponent):
+    __slots__ = ("equipment_type", "ilvl", "defense", "min_damage", "max_damage", "enchants", "rarity")
+
     parent: Item
     rarity: RarityLevel
 
@@ -35,6 +35,11 @@ class Equippable(BaseComponent):
         self.max_damage = max_damage
         self.enchants = []
 
+    def clone(self, parent: Item) -> Equippable:
+        clone = super().clone(parent)
+        clone.enchants = [enchant.clone(parent) for enchant in self.enchants]
+        return clone
+
     def get_color(self) -> Tuple[int, int, int]:
         match self.rarity:
             case RarityLevel.COMMON:
@@ -84,9 +89,9 @@ class Equippable(BaseComponent):
             EnchantType.CON,
         ]
         abilities = [
-            components.enchant.Whirlwind(),
-            components.enchant.LightningBolt(),
-            components.enchant.ShadowStrike(),
+            components.enchant.Whirlwind,
+            components.enchant.LightningBolt,
+            components.enchant.ShadowStrike,
         ]
         max_enchants = 0
 
@@ -102,12 +107,13 @@ class Equippable(BaseComponent):
             case RarityLevel.SET:
                 max_enchants = 4
 
+        rng = self.gamemap.rng.loot
         if max_enchants > 0:
             bonus = int(math.ceil(self.ilvl * self.get_multiplier()))
             if bonus < 1:
                 bonus = 1
-            for num in range(random.randint(0, max_enchants)):
-                enchant_type = random.choice(enchants)
+            for num in range(rng.randint(0, max_enchants)):
+                enchant_type = rng.choice(enchants)
                 match enchant_type:
                     case EnchantType.HP:
                         my_enchant = components.enchant.HPEnchant(bonus)
@@ -128,7 +134,7 @@ class Equippable(BaseComponent):
                     case EnchantType.CON:
                         my_enchant = components.enchant.CONEnchant(bonus)
                     case EnchantType.ABILITY:
-                        my_enchant = copy.deepcopy(random.choice(abilities))
+                        my_enchant = rng.choice(abilities)()
 
                 my_enchant.parent = self.parent
                 self.enchants.append(my_enchant)
@@ -191,45 +197,67 @@ class Equippable(BaseComponent):
         return description
 
 class Dagger(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, min_damage=1, max_damage=4)
 
 class Sword(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, min_damage=1, max_damage=8)
 
 class Axe(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, min_damage=3, max_damage=6)
 
 class Nunchucks(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, min_damage=5, max_damage=5)
 
 class Powerglove(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, min_damage=1, max_damage=30)
 
 class LeatherArmor(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.ARMOR, defense=3)
 
 class ChainMail(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.ARMOR, defense=6)
 
 class Helmet(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.HEAD, defense=2)
 
 class Pants(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.PANTS, defense=2)
 
 class Hands(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.HANDS, defense=2)
 
 class Shoes(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.SHOES, defense=2)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import os
 from typing import TYPE_CHECKING
 
 import color
@@ -11,7 +10,25 @@ from render_order import RenderOrder
 if TYPE_CHECKING:
     from entity import Actor
 
+# The turns it takes to regenerate from nothing to full HP and MP.
+REGENERATION_TURNS = 100
+
 class Fighter(BaseComponent):
+    __slots__ = (
+        "_max_hp",
+        "_max_mp",
+        "base_defense",
+        "min_damage",
+        "max_damage",
+        "_strength",
+        "_intelligence",
+        "_dexterity",
+        "_constitution",
+        "_mp",
+        "_hp",
+        "empowered",
+    )
+
     parent: Actor
     empowered: int
 
@@ -93,6 +110,8 @@ class Fighter(BaseComponent):
 
     @hp.setter
     def hp(self, value: int) -> None:
+        if value < self._hp and self.parent.ai:
+            self.parent.ai.wake()  # Being hurt wakes anything up.
         self._hp = max(0, min(value, self.max_hp))
         if self._hp == 0 and self.parent.ai:
             self.die()
@@ -101,6 +120,15 @@ class Fighter(BaseComponent):
     def mp(self, value: int) -> None:
         self._mp = max(0, min(value, self.max_mp))
 
+    def regenerate(self) -> None:
+        """Recover one turn's worth of HP and MP."""
+        if not self.parent.is_alive:
+            return
+        if self._hp < self.max_hp:
+            self.hp = self._hp + self.max_hp / REGENERATION_TURNS
+        if self._mp < self.max_mp:
+            self.mp = self._mp + self.max_mp / REGENERATION_TURNS
+
     @property
     def defense(self) -> int:
         defense = self.base_defense
@@ -135,8 +163,7 @@ class Fighter(BaseComponent):
         if self.engine.player is self.parent:
             death_message = "You died!"
             death_message_color = color.player_die
-            if os.path.exists("savegame.sav"):
-                os.remove("savegame.sav")  # Deletes the active save file.
+            self.engine.delete_save("savegame.sav")  # Deletes the active save file.
         else:
             death_message = f"{self.parent.name} is dead!"
             death_message_color = color.enemy_die
@@ -149,6 +176,7 @@ class Fighter(BaseComponent):
         self.parent.ai = None
         self.parent.name = f"remains of {self.parent.name}"
         self.parent.render_order = RenderOrder.CORPSE
+        self.gamemap.on_actor_death(self.parent)
 
         self.engine.message_log.add_message(death_message, death_message_color)
 
@@ -2,34 +2,64 @@ from __future__ import annotations
 
 import lzma
 import pickle
-from typing import TYPE_CHECKING
+import shutil
+from typing import Optional, Tuple, TYPE_CHECKING
 
+import numpy as np  # type: ignore
 from tcod.console import Console
 from tcod.map import compute_fov
 
 import color
 import exceptions
 import render_functions
-from message_log import MessageLog
+import tile_types
+from message_log import MessageLog, remove_files
+from random_streams import RandomStreams
+from turn_scheduler import time_per_action
 
 if TYPE_CHECKING:
     from entity import Actor
     from game_map import GameMap
     from game_map import GameMap, GameWorld
 
+# How far the player can see.
+FOV_RADIUS = 8
+
 class Engine:
     game_map: GameMap
     game_world: GameWorld
     win: bool
 
-    def __init__(self, player: Actor):
+    def __init__(self, player: Actor, seed: Optional[int] = None):
+        self.rng = RandomStreams(seed)
         self.message_log = MessageLog()
         self.mouse_location = (0, 0)
         self.player = player
         self.win = False
+        self.flow_field: Optional[np.ndarray] = None
+        # The (floor, player x, player y, tiles_version) the flow field was computed for.
+        self.flow_field_key: Optional[Tuple[int, int, int, int]] = None
+
+    def get_flow_field(self) -> np.ndarray:
+        """Return the distance-to-player map, computing it when the player or the map changed.
+
+        Every chasing monster steps down the same map instead of pathfinding on its own.
+        Other monsters aren't part of the map, each monster steps around them as they are when
+        it moves, so the map stays good for as long as the player stays put.
+        """
+        game_map = self.game_map
+        flow_field_key = (game_map.floor, self.player.x, self.player.y, game_map.tiles_version)
+        if self.flow_field is None or self.flow_field_key != flow_field_key:
+            self.flow_field = game_map.pathfinding.distance_map(
+                [(self.player.x, self.player.y)], crowd=False
+            )
+            self.flow_field_key = flow_field_key
+
+        return self.flow_field
 
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
+        # Let every actor whose action falls within the player's action take its turn.
+        for entity in self.game_map.scheduler.advance(time_per_action(self.player)):
             if entity.ai:
                 try:
                     entity.ai.perform()
@@ -37,14 +67,31 @@ class Engine:
                     pass  # Ignore impossible action exceptions from AI.
 
     def update_fov(self) -> None:
-        """Recompute the visible area based on the players point of view."""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
+        """Recompute the visible area based on the players point of view.
+
+        Nothing is recomputed unless the player moved or the map's tiles changed since the
+        last call, so waiting and using items don't pay for a new field of view.
+        """
+        game_map = self.game_map
+        fov_key = (self.player.x, self.player.y, FOV_RADIUS, game_map.tiles_version)
+        if fov_key == game_map.fov_key:
+            return
+        game_map.fov_key = fov_key
+
+        visible = compute_fov(
+            tile_types.transparent[game_map.tiles],
             (self.player.x, self.player.y),
-            radius=8,
+            radius=FOV_RADIUS,
         )
+        if np.array_equal(visible, game_map.visible):
+            return
+
+        game_map.visible[:] = visible
+        game_map.fov_version += 1
         # If a tile is "visible" it should be added to "explored".
-        self.game_map.explored |= self.game_map.visible
+        game_map.explored |= visible
+
+        game_map.wake_visible_actors()
 
     def render(self, console: Console) -> None:
         self.game_map.render(console)
@@ -84,7 +131,24 @@ class Engine:
         )
 
     def save_as(self, filename: str) -> None:
-        """Save this Engine instance as a compressed file."""
+        """Save this Engine instance as a compressed file.
+
+        Archived messages and floors which aren't in memory aren't part of the save, they
+        are kept beside it in `filename`.log and the `filename`.floors directory.
+        """
+        self.message_log.archive.relocate(f"{filename}.log")
+        self.game_world.game_maps.relocate(f"{filename}.floors")
         save_data = lzma.compress(pickle.dumps(self))
         with open(filename, "wb") as f:
             f.write(save_data)
+
+    def delete_save(self, filename: str) -> None:
+        """Delete a save file along with the archived messages and floors kept beside it.
+
+        Archived messages and spilled floors are moved back to temporary files first, since
+        this game can still use them.
+        """
+        self.message_log.archive.make_temporary()
+        self.game_world.game_maps.make_temporary()
+        remove_files(filename, f"{filename}.log", f"{filename}.log.idx")
+        shutil.rmtree(f"{filename}.floors", ignore_errors=True)
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import copy
 import math
-import random
 from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
     
 from render_order import RenderOrder
+from turn_scheduler import NORMAL_SPEED
 
 if TYPE_CHECKING:
     from components.ai import BaseAI
@@ -22,8 +22,12 @@ T = TypeVar("T", bound="Entity")
 class Entity:
     """
     A generic object to represent players, enemies, items, etc.
+
+    Entities and their components use __slots__, since a floor holds thousands of them.
     """
 
+    __slots__ = ("parent", "x", "y", "char", "color", "name", "blocks_movement", "render_order")
+
     parent: Union[GameMap, Inventory]
 
     def __init__(
@@ -47,31 +51,46 @@ class Entity:
         if parent:
             # If parent isn't provided now then it will be set later.
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     @property
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
 
+    def clone(self: T) -> T:
+        """Return an unplaced copy of this entity.
+
+        Entities are spawned from prototypes in entity_factories.  The copy shares the
+        prototype's immutable data and only copies the state which can change in play, which
+        is much cheaper than deep copying the whole prototype.
+        """
+        clone = copy.copy(self)
+        if hasattr(clone, "parent"):
+            del clone.parent
+        return clone
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int, rarity_chances: Optional[{}]) -> T:
         """Spawn a copy of this instance at the given location."""
-        clone = copy.deepcopy(self)
+        clone = self.clone()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
 
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         """Place this entity at a new location.  Handles moving across GameMaps."""
+        if hasattr(self, "parent"):  # Possibly uninitialized.
+            if self.parent is self.gamemap:
+                if gamemap is None or gamemap is self.parent:
+                    self.parent.move_entity(self, x, y)
+                    return
+                self.gamemap.remove_entity(self)
         self.x = x
         self.y = y
         if gamemap:
-            if hasattr(self, "parent"):  # Possibly uninitialized.
-                if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
             self.parent = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -81,10 +100,11 @@ class Entity:
 
     def move(self, dx: int, dy: int) -> None:
         # Move the entity by a given amount
-        self.x += dx
-        self.y += dy
+        self.place(self.x + dx, self.y + dy)
 
 class Actor(Entity):
+    __slots__ = ("ai", "equipment", "fighter", "inventory", "level", "speed")
+
     def __init__(
         self,
         *,
@@ -98,6 +118,7 @@ class Actor(Entity):
         fighter: Fighter,
         inventory: Inventory,
         level: Level,
+        speed: int = NORMAL_SPEED,
     ):
         super().__init__(
             x=x,
@@ -123,13 +144,26 @@ class Actor(Entity):
         self.level = level
         self.level.parent = self
 
+        # How quickly this actor acts, relative to NORMAL_SPEED.
+        self.speed = speed
+
+    def clone(self: T) -> T:
+        clone = super().clone()
+        clone.fighter = self.fighter.clone(clone)
+        clone.level = self.level.clone(clone)
+        # The inventory comes before the equipment, which wears the cloned items.
+        clone.inventory = self.inventory.clone(clone)
+        clone.equipment = self.equipment.clone(clone)
+        clone.ai = self.ai.clone(clone) if self.ai else None
+        return clone
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int, rarity_chances: {}) -> T:
         """Spawn a copy of this instance at the given location."""
-        clone = copy.deepcopy(self)
+        clone = self.clone()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
 
         return clone
 
@@ -139,7 +173,7 @@ class Actor(Entity):
         return bool(self.ai)
 
 class Item(Entity):
-    count = 1
+    __slots__ = ("count", "stackable", "consumable", "equippable")
 
     def __init__(
         self,
@@ -163,7 +197,7 @@ class Item(Entity):
             render_order=RenderOrder.ITEM,
         )
 
-
+        self.count = 1
         self.stackable = stackable
 
         self.consumable = consumable
@@ -176,26 +210,37 @@ class Item(Entity):
         if self.equippable:
             self.equippable.parent = self
 
+    def clone(self: T) -> T:
+        clone = super().clone()
+        if self.consumable:
+            clone.consumable = self.consumable.clone(clone)
+        if self.equippable:
+            clone.equippable = self.equippable.clone(clone)
+        return clone
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int, rarity_chances: {}) -> T:
         """Spawn a copy of this instance at the given location."""
-        clone = copy.deepcopy(self)
+        clone = self.clone()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
 
         if self.equippable:
-            min_ilvl = int(gamemap.engine.game_world.current_floor * 0.5)
-            max_ilvl = int(gamemap.engine.game_world.current_floor * 1.5)
+            min_ilvl = int(gamemap.floor * 0.5)
+            max_ilvl = int(gamemap.floor * 1.5)
 
-            clone.equippable.rarity = random.choices(
+            rng = gamemap.rng.loot
+            clone.equippable.rarity = rng.choices(
                 list(rarity_chances.keys()), weights=list(rarity_chances.values())
             )[0]
             clone.color = clone.equippable.get_color()
-            clone.equippable.ilvl = random.randint(min_ilvl, max_ilvl)
+            clone.equippable.ilvl = rng.randint(min_ilvl, max_ilvl)
             clone.name = "(ilvl " + str(clone.equippable.ilvl) + ") " + clone.name
             clone.equippable.enchant()
 
+        # Added once its color is final, since the map keeps a copy of it for drawing.
+        gamemap.add_entity(clone)
+
         return clone
 
     def get_use_text(self, player: Actor) -> str:
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import io
+import lzma
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Dict, Optional, TYPE_CHECKING
+import weakref
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from game_map import GameMap
+
+# How many floors are kept in memory by default, counting the one the player is on.
+FLOORS_IN_MEMORY = 3
+
+
+class FloorPickler(pickle.Pickler):
+    """Pickles a floor on its own, leaving out the engine and player it refers to."""
+
+    def __init__(self, file: io.BufferedIOBase, engine: Engine):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.engine = engine
+
+    def persistent_id(self, obj: object) -> Optional[str]:
+        if obj is self.engine:
+            return "engine"
+        if obj is self.engine.player:
+            return "player"
+        return None
+
+
+class FloorUnpickler(pickle.Unpickler):
+    """Loads a floor saved by FloorPickler, reattaching it to the running engine."""
+
+    def __init__(self, file: io.BufferedIOBase, engine: Engine):
+        super().__init__(file)
+        self.engine = engine
+
+    def persistent_load(self, pid: str) -> object:
+        if pid == "engine":
+            return self.engine
+        if pid == "player":
+            return self.engine.player
+        raise pickle.UnpicklingError(f"Unknown persistent id: {pid!r}")
+
+
+class FloorStore:
+    """
+    The visited floors of a GameWorld, by floor number.
+
+    Only the most recently visited floors are kept in memory.  Older floors are written to
+    compressed files and loaded back when they are visited again.  Floors are written to a
+    scratch directory as they are spilled, and only moved beside a save file when the game
+    is saved, so a save's floors never change until the next save.
+
+    Neither the floor in play nor the most recently used one is spilled, even if that puts
+    the store over its budget for a while.  When changing floors those are the floor the
+    player is leaving and the one they are about to enter.
+    """
+
+    def __init__(self, engine: Engine, floors_in_memory: int = FLOORS_IN_MEMORY):
+        self.engine = engine
+        self.floors_in_memory = max(1, floors_in_memory)
+        self.loaded: OrderedDict[int, GameMap] = OrderedDict()  # Least recently used first.
+        self.spilled: Dict[int, str] = {}  # Paths of the floors which are on disk.
+        self._reset()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_scratch_directory"], state["_remove_scratch"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._scratch_directory: Optional[str] = None
+        self._remove_scratch: Optional[weakref.finalize] = None
+
+    def __contains__(self, floor: int) -> bool:
+        return floor in self.loaded or floor in self.spilled
+
+    def __len__(self) -> int:
+        return len(self.loaded) + len(self.spilled)
+
+    def __getitem__(self, floor: int) -> GameMap:
+        """Return the map of a floor, loading it from disk if it was spilled."""
+        if floor in self.loaded:
+            self.loaded.move_to_end(floor)
+            return self.loaded[floor]
+        if floor not in self.spilled:
+            raise KeyError(floor)
+
+        with lzma.open(self.spilled.pop(floor), "rb") as f:
+            game_map = FloorUnpickler(f, self.engine).load()
+        self[floor] = game_map
+        return game_map
+
+    def __setitem__(self, floor: int, game_map: GameMap) -> None:
+        self.spilled.pop(floor, None)
+        self.loaded[floor] = game_map
+        self.loaded.move_to_end(floor)
+        self.trim()
+
+    def in_play(self, game_map: GameMap) -> bool:
+        """Return True if the game or the player is on `game_map`."""
+        player = self.engine.player
+        return game_map is getattr(self.engine, "game_map", None) or (
+            hasattr(player, "parent") and player.parent is game_map
+        )
+
+    def trim(self) -> None:
+        """Spill the least recently used floors until the store is within its budget."""
+        while len(self.loaded) > self.floors_in_memory:
+            spillable = [
+                floor
+                for floor, game_map in list(self.loaded.items())[:-1]
+                if not self.in_play(game_map)
+            ]
+            if not spillable:
+                return
+            self.spill(spillable[0])
+
+    def spill(self, floor: int) -> None:
+        """Write a floor out to disk and drop it from memory."""
+        game_map = self.loaded.pop(floor)
+        path = os.path.join(self.scratch_directory, f"floor-{floor}.xz")
+        with lzma.open(path, "wb") as f:
+            FloorPickler(f, self.engine).dump(game_map)
+        self.spilled[floor] = path
+
+    @property
+    def scratch_directory(self) -> str:
+        """A temporary directory for spilled floors, removed along with this store."""
+        if self._scratch_directory is None:
+            self._scratch_directory = tempfile.mkdtemp(prefix="floors-")
+            self._remove_scratch = weakref.finalize(
+                self, shutil.rmtree, self._scratch_directory, ignore_errors=True
+            )
+        return self._scratch_directory
+
+    def make_temporary(self) -> None:
+        """Move spilled floors kept with a save file back to the scratch directory."""
+        if self.spilled:
+            self.relocate(self.scratch_directory)
+
+    def relocate(self, directory: str) -> None:
+        """Move the spilled floors into `directory`, so they are kept with a save file.
+
+        Floors already in `directory` aren't touched, and any files there which are no longer
+        needed are removed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for floor, path in self.spilled.items():
+            new_path = os.path.join(directory, f"floor-{floor}.xz")
+            if os.path.abspath(path) != os.path.abspath(new_path):
+                shutil.move(path, new_path)
+                self.spilled[floor] = new_path
+
+        in_use = {os.path.abspath(path) for path in self.spilled.values()}
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if os.path.abspath(path) not in in_use:
+                os.remove(path)
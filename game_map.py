@@ -1,25 +1,63 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
 
 import numpy as np  # type: ignore
 from tcod.console import Console
 
+from awareness_states import AwarenessState
 from entity import Actor, Item
+from floor_store import FLOORS_IN_MEMORY, FloorStore
+from pathfinding import PathService
+from render_layer import RenderLayer
+from render_order import RenderOrder
 import tile_types
+from turn_scheduler import TurnScheduler
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
+    from random_streams import FloorStreams
+
+# The glyph of a decal, which is drawn under any entities on its tile.
+decal_dt = np.dtype([("ch", np.int32), ("fg", "3B")])
+
+# Generates floors in the background, one at a time.
+floor_generator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="floor-generator")
 
 class GameMap:
     def __init__(
-        self, engine: Engine, width: int, height: int, entities: Iterable[Entity] = ()
+        self,
+        engine: Engine,
+        width: int,
+        height: int,
+        entities: Iterable[Entity] = (),
+        floor: int = 1,
     ):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
-        self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
+        self.floor = floor
+        self.rng: Optional[FloorStreams] = None  # Set while this floor is being generated.
+        self.pathfinding = PathService(self)
+        self.entities = set()
+        # The entities split up by kind, kept up to date as entities come, go and die.
+        self.live_actors: Set[Actor] = set()
+        self.dead_actors: Set[Actor] = set()
+        self.ground_items: Set[Item] = set()
+        # Living actors other than the player, in the order they will act.
+        self.scheduler = TurnScheduler()
+        # Entities bucketed by (x, y), so lookups by tile don't scan every entity.
+        self.entities_by_location: Dict[Tuple[int, int], List[Entity]] = {}
+        # Entities grouped by how they are layered when drawn.
+        self.render_layers: Dict[RenderOrder, RenderLayer] = {order: RenderLayer() for order in RenderOrder}
+        for entity in entities:
+            self.add_entity(entity)
+        # One tile id per cell, see tile_types for the properties of each id.
+        self.tiles = np.full(
+            (width, height), fill_value=tile_types.wall, dtype=np.uint8, order="F"
+        )
+        self.tiles_version = 0  # Bumped by tiles_changed(), so caches of the tiles know to rebuild.
 
         self.visible = np.full(
             (width, height), fill_value=False, order="F"
@@ -27,50 +65,179 @@ class GameMap:
         self.explored = np.full(
             (width, height), fill_value=False, order="F"
         )  # Tiles the player has seen before
+        # Remains left on each tile, as an index into decal_names and decal_graphics.  0 is none.
+        self.decals = np.zeros((width, height), dtype=np.uint16, order="F")
+        self.decal_names: List[str] = [""]
+        self.decal_graphics = np.zeros(1, dtype=decal_dt)
+        self.decal_ids: Dict[Tuple[str, str, Tuple[int, int, int]], int] = {}
+        # What `visible` was last computed from, and a counter bumped whenever it changes.
+        self.fov_key: Optional[Tuple[int, int, int, int]] = None
+        self.fov_version = 0
+        # The composed map graphics, and the (tiles_version, fov_version) they were built from.
+        self.background: Optional[np.ndarray] = None
+        self.background_key: Optional[Tuple[int, int]] = None
         self.downstairs_location = (0, 0)
         self.upstairs_location = (0, 0)
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # The background is rebuilt on the first render, so don't save it.
+        state["background"] = state["background_key"] = None
+        return state
+
     @property
     def gamemap(self) -> GameMap:
         return self
 
+    def tiles_changed(self) -> None:
+        """Call after changing `tiles`, to invalidate anything computed from them."""
+        self.tiles_version += 1
+
     @property
-    def actors(self) -> Iterator[Actor]:
-        """Iterate over this maps living actors."""
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+    def actors(self) -> Set[Actor]:
+        """This maps living actors.  Iterate over a copy if actors may die or leave meanwhile."""
+        return self.live_actors
 
     @property
-    def items(self) -> Iterator[Item]:
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Item)
-        )
+    def items(self) -> Set[Item]:
+        """The items lying on this map."""
+        return self.ground_items
+
+    def entity_set(self, entity: Entity) -> Optional[Set[Entity]]:
+        """Return which of live_actors, dead_actors or ground_items holds `entity`."""
+        if isinstance(entity, Actor):
+            return self.live_actors if entity.is_alive else self.dead_actors
+        if isinstance(entity, Item):
+            return self.ground_items
+        return None
+
+    def add_entity(self, entity: Entity) -> None:
+        """Add an entity to this map, indexed at its current location."""
+        self.entities.add(entity)
+        entity_set = self.entity_set(entity)
+        if entity_set is not None:
+            entity_set.add(entity)
+        self.entities_by_location.setdefault((entity.x, entity.y), []).append(entity)
+        self.render_layers[entity.render_order].add(entity)
+        if entity.blocks_movement:
+            self.pathfinding.occupy(entity.x, entity.y)
+        if (
+            isinstance(entity, Actor)
+            and entity.is_alive
+            and not entity.ai.is_dormant
+            and entity is not self.engine.player
+        ):
+            self.scheduler.add(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Remove an entity from this map and from the location index."""
+        self.entities.remove(entity)
+        entity_set = self.entity_set(entity)
+        if entity_set is not None:
+            entity_set.discard(entity)
+        self.unindex_entity(entity)
+        self.render_layers[entity.render_order].discard(entity)
+        if entity.blocks_movement:
+            self.pathfinding.vacate(entity.x, entity.y)
+        self.scheduler.remove(entity)
+
+    def on_actor_death(self, actor: Actor) -> None:
+        """Called after an actor on this map has died.
+
+        Monsters are replaced by a decal of their remains, so they and their components are
+        released.  The player stays on the map, since the game over screen still shows them.
+        """
+        self.scheduler.remove(actor)
+        self.live_actors.discard(actor)
+        self.pathfinding.vacate(actor.x, actor.y)  # Corpses don't block movement.
+        self.render_layers[RenderOrder.ACTOR].discard(actor)
+        if actor is self.engine.player:
+            self.dead_actors.add(actor)
+            self.render_layers[actor.render_order].add(actor)
+        else:
+            self.add_decal(actor.x, actor.y, actor.name, actor.char, actor.color)
+            self.entities.remove(actor)
+            self.unindex_entity(actor)
+
+    def add_decal(self, x: int, y: int, name: str, char: str, color: Tuple[int, int, int]) -> None:
+        """Leave a decal at (x, y), replacing any decal already there."""
+        key = (name, char, color)
+        decal_id = self.decal_ids.get(key)
+        if decal_id is None:
+            decal_id = self.decal_ids[key] = len(self.decal_names)
+            self.decal_names.append(name)
+            self.decal_graphics = np.append(
+                self.decal_graphics, np.array([(ord(char), color)], dtype=decal_dt)
+            )
+        self.decals[x, y] = decal_id
+
+    def move_entity(self, entity: Entity, x: int, y: int) -> None:
+        """Move an entity on this map to a new location, keeping the index up to date."""
+        self.unindex_entity(entity)
+        if entity.blocks_movement:
+            self.pathfinding.vacate(entity.x, entity.y)
+            self.pathfinding.occupy(x, y)
+        entity.x = x
+        entity.y = y
+        self.entities_by_location.setdefault((x, y), []).append(entity)
+        self.render_layers[entity.render_order].move(entity, x, y)
+
+    def unindex_entity(self, entity: Entity) -> None:
+        """Drop an entity from the location index bucket it is currently in."""
+        location = (entity.x, entity.y)
+        bucket = self.entities_by_location[location]
+        bucket.remove(entity)
+        if not bucket:
+            del self.entities_by_location[location]
+
+    def get_entities_at_location(self, x: int, y: int) -> Iterator[Entity]:
+        """Iterate over the entities at the given location."""
+        yield from self.entities_by_location.get((x, y), ())
+
+    def get_names_at_location(self, x: int, y: int) -> List[str]:
+        """Return the names of everything at the given location, starting with any remains."""
+        names = [entity.name for entity in self.get_entities_at_location(x, y)]
+        decal = self.decals[x, y]
+        if decal:
+            names.insert(0, self.decal_names[decal])  # Remains lie under everything else.
+        return names
 
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int,
     ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        for entity in self.get_entities_at_location(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
 
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.get_entities_at_location(x, y):
+            if entity in self.live_actors:
+                return entity
 
         return None
 
+    def wake_visible_actors(self) -> None:
+        """Wake idle actors that are in the player's field of view.
+
+        Only the occupied tiles are checked, rather than every visible tile.
+        """
+        for (x, y), entities in self.entities_by_location.items():
+            if not self.visible[x, y]:
+                continue
+            for entity in entities:
+                if isinstance(entity, Actor) and entity.ai and entity.ai.awareness is AwarenessState.IDLE:
+                    entity.ai.wake()
+
+    def make_noise(self, x: int, y: int, radius: int) -> None:
+        """Alert dormant actors within `radius` tiles of a noise at (x, y)."""
+        for noise_x in range(max(0, x - radius), min(self.width, x + radius + 1)):
+            for noise_y in range(max(0, y - radius), min(self.height, y + radius + 1)):
+                for entity in self.get_entities_at_location(noise_x, noise_y):
+                    if isinstance(entity, Actor) and entity.ai and entity.ai.is_dormant:
+                        entity.ai.hear_noise(x, y)
+
     def in_bounds(self, x: int, y: int) -> bool:
         """Return True if x and y are inside of the bounds of this map."""
         return 0 <= x < self.width and 0 <= y < self.height
@@ -82,23 +249,41 @@ class GameMap:
         If a tile is in the "visible" array, then draw it with the "light" colors.
         If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
         Otherwise, the default is "SHROUD".
+
+        The result only changes along with the tiles or the FOV, so it is composed once and
+        copied onto the console until one of those changes.
         """
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
-            default=tile_types.SHROUD,
-        )
+        background_key = (self.tiles_version, self.fov_version)
+        if self.background_key != background_key:
+            # Explored tiles select row 1 of the graphics table (dark), visible ones row 2 (light).
+            visibility = self.explored.astype(np.uint8)
+            visibility[self.visible] = 2
+            self.background = tile_types.graphics[visibility, self.tiles]
+            self.background_key = background_key
 
-        entities_sorted_for_rendering = sorted(
-            self.entities, key=lambda x: x.render_order.value
-        )
+        console.tiles_rgb[0 : self.width, 0 : self.height] = self.background
 
-        for entity in entities_sorted_for_rendering:
-            # Only print entities that are in the FOV
-            if self.visible[entity.x, entity.y]:
-                console.print(
-                    x=entity.x, y=entity.y, string=entity.char, fg=entity.color
-                )
+        # Decals go under every entity.
+        x, y = np.nonzero(self.visible & (self.decals != 0))
+        if x.size:
+            decals = self.decal_graphics[self.decals[x, y]]
+            console.tiles_rgb["ch"][x, y] = decals["ch"]
+            console.tiles_rgb["fg"][x, y] = decals["fg"]
+
+        # Draw each layer with one assignment, so later layers end up on top.
+        for order in RenderOrder:
+            layer = self.render_layers[order]
+            count = len(layer)
+            if not count:
+                continue
+            x, y = layer.positions[:count].T
+            # Only draw entities that are in the FOV
+            in_fov = self.visible[x, y]
+            if not in_fov.any():
+                continue
+            x, y = x[in_fov], y[in_fov]
+            console.tiles_rgb["ch"][x, y] = layer.chars[:count][in_fov]
+            console.tiles_rgb["fg"][x, y] = layer.colors[:count][in_fov]
 
 class GameWorld:
     """
@@ -114,7 +299,9 @@ class GameWorld:
         max_rooms: int,
         room_min_size: int,
         room_max_size: int,
-        current_floor: int = 1
+        current_floor: int = 1,
+        floors_in_memory: int = FLOORS_IN_MEMORY,
+        pregenerate_floors: bool = True,
     ):
         self.engine = engine
 
@@ -128,20 +315,53 @@ class GameWorld:
 
         self.current_floor = current_floor
 
-        self.game_maps = {}
+        # Visited floors, the least recently visited are kept on disk.
+        self.game_maps = FloorStore(engine, floors_in_memory)
 
-    def generate_floor(self) -> None:
+        # Whether to generate the next floor in the background, and that floor and its result.
+        self.pregenerate_floors = pregenerate_floors
+        self.pregenerating: Optional[Tuple[int, Future]] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # Floors come out the same whenever they are generated, so just generate it again.
+        state["pregenerating"] = None
+        return state
+
+    def build_floor(self, floor: int) -> GameMap:
+        """Generate and return the map for a floor, without adding it to this world."""
         from procgen import generate_dungeon
 
-        self.game_maps[self.current_floor] = generate_dungeon(
+        return generate_dungeon(
             max_rooms=self.max_rooms,
             room_min_size=self.room_min_size,
             room_max_size=self.room_max_size,
             map_width=self.map_width,
             map_height=self.map_height,
             engine=self.engine,
+            floor=floor,
         )
 
+    def pregenerate(self, floor: int) -> None:
+        """Start generating a floor in the background, unless it exists or is already underway."""
+        if not self.pregenerate_floors or floor in self.game_maps:
+            return
+        if self.pregenerating is not None and self.pregenerating[0] == floor:
+            return
+        self.pregenerating = (floor, floor_generator.submit(self.build_floor, floor))
+
+    def generate_floor(self) -> None:
+        """Add the map for the current floor, using the background result if there is one.
+
+        A floor still being generated is waited for, since that is quicker than starting over.
+        """
+        if self.pregenerating is not None and self.pregenerating[0] == self.current_floor:
+            game_map = self.pregenerating[1].result()
+            self.pregenerating = None
+        else:
+            game_map = self.build_floor(self.current_floor)
+        self.game_maps[self.current_floor] = game_map
+
     def move(self, direction: int) -> None:
         self.current_floor += direction
         if not self.current_floor in self.game_maps:
@@ -152,3 +372,9 @@ class GameWorld:
             self.engine.player.place(*self.engine.game_map.downstairs_location, self.engine.game_map)
         else:
             self.engine.player.place(*self.engine.game_map.upstairs_location, self.engine.game_map)
+
+        # The floor that was just left couldn't be spilled while the player was still on it.
+        self.game_maps.trim()
+
+        # Get the next floor down ready while the player is busy with this one.
+        self.pregenerate(self.current_floor + 1)
@@ -1,9 +1,7 @@
 from __future__ import annotations
 
-import os
-
 import color
-from typing import Callable, Optional, Tuple, TYPE_CHECKING, Union
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING, Union
 
 import tcod.event
 import numpy as np  # type: ignore
@@ -13,11 +11,16 @@ import actions
 from actions import (
     Action,
     BumpAction,
+    MovementAction,
     PickupAction,
     WaitAction,
 )
 import color
 import exceptions
+import tile_types
+
+from engine import FOV_RADIUS
+from entity import Item
 
 if TYPE_CHECKING:
     from engine import Engine
@@ -58,11 +61,53 @@ WAIT_KEYS = {
     tcod.event.K_CLEAR,
 }
 
+# The most turns a single run or rest command can take.
+MAX_RUN_TURNS = 100
+MAX_REST_TURNS = 100
+# The most turns a single explore or travel command can take.
+MAX_TRAVEL_TURNS = 1000
+
 CONFIRM_KEYS = {
     tcod.event.K_RETURN,
     tcod.event.K_KP_ENTER,
 }
 
+# Events which can change what a handler draws.  Mouse motion is handled separately since
+# it only matters when the mouse moves onto a different tile.
+REDRAW_EVENTS = (tcod.event.KeyDown, tcod.event.MouseButtonDown)
+
+def coalesce_events(events: Iterable[tcod.event.Event]) -> Iterator[tcod.event.Event]:
+    """Thin out a batch of queued events before they are handled.
+
+    Consecutive mouse motions are merged into the last one, since only where the mouse
+    ended up matters.  Key repeats are dropped if the same key repeat already queued up
+    in this batch, so holding a key down while turns are slow doesn't build a backlog of
+    moves.  Actual key presses are always kept.
+    """
+    motion: Optional[tcod.event.MouseMotion] = None
+    repeated_sym: Optional[int] = None
+    for event in events:
+        if isinstance(event, tcod.event.MouseMotion):
+            motion = event
+            continue
+        if motion is not None:
+            yield motion
+            motion = None
+
+        if isinstance(event, tcod.event.KeyDown):
+            if event.repeat:
+                if event.sym == repeated_sym:
+                    continue  # A stale repeat of a key which is already being handled.
+                repeated_sym = event.sym
+            else:
+                repeated_sym = None
+        elif isinstance(event, tcod.event.KeyUp):
+            repeated_sym = None
+        yield event
+
+    if motion is not None:
+        yield motion
+
 ActionOrHandler = Union[Action, "BaseEventHandler"]
 """An event handler return value which can trigger an action or switch active handlers.
 
@@ -72,10 +117,17 @@ MainGameEventHandler will become the active handler.
 """
 
 class BaseEventHandler(tcod.event.EventDispatch[ActionOrHandler]):
+    # True when on_render would draw something different from the last frame.
+    # The main loop only renders dirty handlers, and clears the flag afterwards.
+    dirty = True
+
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         """Handle an event and return the next active event handler."""
+        if isinstance(event, REDRAW_EVENTS):
+            self.dirty = True
         state = self.dispatch(event)
         if isinstance(state, BaseEventHandler):
+            state.dirty = True
             return state
         assert not isinstance(state, Action), f"{self!r} can not handle actions."
         return self
@@ -118,19 +170,45 @@ class EventHandler(BaseEventHandler):
 
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         """Handle events for input handlers with an engine."""
+        if isinstance(event, REDRAW_EVENTS):
+            self.dirty = True
         action_or_state = self.dispatch(event)
         if isinstance(action_or_state, BaseEventHandler):
+            action_or_state.dirty = True
             return action_or_state
         if self.handle_action(action_or_state):
             # A valid action was performed.
-            if not self.engine.player.is_alive:
-                # The player was killed sometime during or after the action.
-                return GameOverEventHandler(self.engine)
-            elif self.engine.player.level.requires_level_up:
-                return LevelUpEventHandler(self.engine)
-            return MainGameEventHandler(self.engine)  # Return to the main handler.
+            return self.after_turn()
         return self
 
+    def after_turn(self) -> BaseEventHandler:
+        """Return the handler to switch to after the player has taken a turn."""
+        if not self.engine.player.is_alive:
+            # The player was killed sometime during or after the action.
+            return GameOverEventHandler(self.engine)
+        elif self.engine.player.level.requires_level_up:
+            return LevelUpEventHandler(self.engine)
+        return MainGameEventHandler(self.engine)  # Return to the main handler.
+
+    def take_turns(self, turn_actions: Iterable[Action]) -> Optional[BaseEventHandler]:
+        """Perform actions one turn after another without rendering in between.
+
+        Stops early when an action fails, or when the player needs to respond to something.
+        Returns the handler to switch to, or None if no turn was taken.
+        """
+        took_turn = False
+        for action in turn_actions:
+            if not self.handle_action(action):
+                break
+            took_turn = True
+            player = self.engine.player
+            if not player.is_alive or player.level.requires_level_up or self.engine.win:
+                break
+
+        if took_turn:
+            return self.after_turn()
+        return None
+
     def handle_action(self, action: Optional[Action]) -> bool:
         """Handle actions returned from event methods.
 
@@ -145,6 +223,7 @@ class EventHandler(BaseEventHandler):
             self.engine.message_log.add_message(exc.args[0], color.impossible)
             return False  # Skip enemy turn on exceptions.
 
+        self.engine.player.fighter.regenerate()
         self.engine.handle_enemy_turns()
 
         self.engine.update_fov()
@@ -152,7 +231,10 @@ class EventHandler(BaseEventHandler):
 
     def ev_mousemotion(self, event: tcod.event.MouseMotion) -> None:
         if self.engine.game_map.in_bounds(event.tile.x, event.tile.y):
-            self.engine.mouse_location = event.tile.x, event.tile.y
+            mouse_location = event.tile.x, event.tile.y
+            if mouse_location != self.engine.mouse_location:
+                self.engine.mouse_location = mouse_location
+                self.dirty = True  # The names under the mouse or the cursor may have changed.
 
     def on_render(self, console: tcod.Console) -> None:
         self.engine.render(console)
@@ -168,6 +250,8 @@ class MainGameEventHandler(EventHandler):
 
         if key in MOVE_KEYS:
             dx, dy = MOVE_KEYS[key]
+            if mod & tcod.event.Modifier.SHIFT:
+                return self.take_turns(self.run(dx, dy))
             action = BumpAction(player, dx, dy)
         elif (key == tcod.event.K_PERIOD) and (mod & tcod.event.Modifier.SHIFT):
             return actions.DownStairsAction(player)
@@ -177,6 +261,12 @@ class MainGameEventHandler(EventHandler):
             raise SystemExit()
         elif key in WAIT_KEYS:
             action = WaitAction(player)
+        elif key == tcod.event.K_r:
+            return self.take_turns(self.rest())
+        elif key == tcod.event.K_o:
+            return self.take_turns(self.explore())
+        elif key == tcod.event.K_t:
+            return self.take_turns(self.travel_to(*self.engine.game_map.downstairs_location))
         elif key == tcod.event.K_v:
             return HistoryViewer(self.engine)
         elif key == tcod.event.K_g:
@@ -196,11 +286,149 @@ class MainGameEventHandler(EventHandler):
 
         return action
 
+    def ev_mousebuttondown(self, event: tcod.event.MouseButtonDown) -> Optional[ActionOrHandler]:
+        """Left clicking on the map travels to that tile."""
+        if event.button == 1 and self.engine.game_map.in_bounds(*event.tile):
+            return self.take_turns(self.travel_to(*event.tile))
+        return None
+
+    def hostile_in_view(self) -> bool:
+        """Return True if the player can see any monster."""
+        game_map = self.engine.game_map
+        return any(
+            game_map.visible[actor.x, actor.y]
+            for actor in game_map.actors
+            if actor is not self.engine.player
+        )
+
+    def run(self, dx: int, dy: int) -> Iterator[Action]:
+        """Move in a direction until something interesting happens.
+
+        The first step is an ordinary move.  After that running stops when a monster comes
+        into view, the player gets hurt, there is something to pick up or stairs underfoot,
+        or the way ahead is blocked.
+        """
+        player = self.engine.player
+        game_map = self.engine.game_map
+        yield BumpAction(player, dx, dy)
+
+        hp = player.fighter.hp
+        for _ in range(MAX_RUN_TURNS - 1):
+            if self.hostile_in_view() or player.fighter.hp < hp:
+                return
+            hp = player.fighter.hp  # Regenerating raises it, so only a drop since the last step counts.
+            if (player.x, player.y) in (game_map.downstairs_location, game_map.upstairs_location):
+                return
+            if any(isinstance(entity, Item) for entity in game_map.get_entities_at_location(player.x, player.y)):
+                return
+            dest_x, dest_y = player.x + dx, player.y + dy
+            if (
+                not game_map.in_bounds(dest_x, dest_y)
+                or not tile_types.walkable[game_map.tiles[dest_x, dest_y]]
+                or game_map.get_blocking_entity_at_location(dest_x, dest_y)
+            ):
+                return
+            yield MovementAction(player, dx, dy)
+
+    def rest(self) -> Iterator[Action]:
+        """Wait until HP and MP have regenerated, or until a monster comes into view or the player is hurt."""
+        player = self.engine.player
+        fighter = player.fighter
+        if self.hostile_in_view():
+            self.engine.message_log.add_message("You can't rest with enemies in view.", color.impossible)
+            return
+        if fighter.hp == fighter.max_hp and fighter.mp == fighter.max_mp:
+            self.engine.message_log.add_message("You are already fully rested.", color.impossible)
+            return
+
+        for _ in range(MAX_REST_TURNS):
+            hp = fighter.hp
+            yield WaitAction(player)
+            if self.hostile_in_view() or fighter.hp < hp:
+                return
+            if fighter.hp == fighter.max_hp and fighter.mp == fighter.max_mp:
+                return
+
+    def next_step(self, path: List[Tuple[int, int]], hp: int) -> Optional[Action]:
+        """Return the move to the first tile of `path`, or None if travelling should stop.
+
+        Travelling stops when a monster is in view, the player has dropped below `hp` (their
+        HP before the previous step), or the next tile is blocked.
+        """
+        player = self.engine.player
+        if self.hostile_in_view() or player.fighter.hp < hp:
+            return None
+        dest_x, dest_y = path[0]
+        if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
+            return None
+        return MovementAction(player, dest_x - player.x, dest_y - player.y)
+
+    def explore(self) -> Iterator[Action]:
+        """Walk towards the nearest unexplored tile, and keep going until interrupted.
+
+        A path is followed all the way to the tile it leads to, even once that tile has come
+        into view, and only then is the next one worked out.  Exploring stops on tiles with
+        items, so they can be picked up.
+        """
+        player = self.engine.player
+        game_map = self.engine.game_map
+        if self.hostile_in_view():
+            self.engine.message_log.add_message("You can't explore with enemies in view.", color.impossible)
+            return
+
+        hp = player.fighter.hp
+        path: List[Tuple[int, int]] = []
+        for _ in range(MAX_TRAVEL_TURNS):
+            if not path:
+                # Arrived, so head for the next unexplored tile.
+                path = game_map.pathfinding.travel_path((player.x, player.y), ~game_map.explored)
+                if not path:
+                    self.engine.message_log.add_message("There is nowhere left to explore.", color.impossible)
+                    return
+
+            action = self.next_step(path, hp)
+            if action is None:
+                return
+            hp = player.fighter.hp
+            yield action
+            path.pop(0)
+            if any(isinstance(entity, Item) for entity in game_map.get_entities_at_location(player.x, player.y)):
+                return
+
+    def travel_to(self, x: int, y: int) -> Iterator[Action]:
+        """Walk to an explored tile, until arriving or being interrupted."""
+        player = self.engine.player
+        game_map = self.engine.game_map
+        if not game_map.explored[x, y]:
+            self.engine.message_log.add_message("You don't know the way there.", color.impossible)
+            return
+        if self.hostile_in_view():
+            self.engine.message_log.add_message("You can't travel with enemies in view.", color.impossible)
+            return
+
+        goal = np.zeros_like(game_map.explored)
+        goal[x, y] = True
+        # Worked out once, since the way through explored tiles can't change along the way.
+        path = game_map.pathfinding.travel_path((player.x, player.y), goal)
+        if not path and (player.x, player.y) != (x, y):
+            self.engine.message_log.add_message("You can't find a way there.", color.impossible)
+            return
+
+        hp = player.fighter.hp
+        for _ in range(MAX_TRAVEL_TURNS):
+            if not path:
+                return
+            action = self.next_step(path, hp)
+            if action is None:
+                return
+            hp = player.fighter.hp
+            yield action
+            path.pop(0)
+
 class GameOverEventHandler(EventHandler):
     def on_quit(self) -> None:
         """Handle exiting out of a finished game."""
-        if os.path.exists("savegame.sav"):
-            os.remove("savegame.sav")  # Deletes the active save file.
+        self.engine.delete_save("savegame.sav")  # Deletes the active save file.
         raise exceptions.QuitWithoutSaving()  # Avoid saving a finished game.
 
     def ev_quit(self, event: tcod.event.Quit) -> None:
@@ -222,7 +450,7 @@ class HistoryViewer(EventHandler):
 
     def __init__(self, engine: Engine):
         super().__init__(engine)
-        self.log_length = len(engine.message_log.messages)
+        self.log_length = len(engine.message_log)
         self.cursor = self.log_length - 1
 
     def on_render(self, console: tcod.Console) -> None:
@@ -243,7 +471,7 @@ class HistoryViewer(EventHandler):
             1,
             log_console.width - 2,
             log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
+            self.engine.message_log.iter_back(self.cursor + 1),
         )
         log_console.blit(console, 3, 3)
 
@@ -275,8 +503,7 @@ class GameWinHandler(HistoryViewer):
 
     def on_quit(self) -> None:
         """Handle exiting out of a finished game."""
-        if os.path.exists("savegame.sav"):
-            os.remove("savegame.sav")  # Deletes the active save file.
+        self.engine.delete_save("savegame.sav")  # Deletes the active save file.
         raise exceptions.QuitWithoutSaving()  # Avoid saving a finished game.
 
     def ev_quit(self, event: tcod.event.Quit) -> None:
@@ -639,17 +866,10 @@ class BeemRangedAttackHandler(SelectIndexHandler):
         x, y = self.engine.mouse_location
 
         if self.player.gamemap.visible[x, y]:
-            cost = np.array(self.player.gamemap.tiles["walkable"], dtype=np.int8)
-            graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
-            pathfinder = tcod.path.Pathfinder(graph)
-
-            pathfinder.add_root((self.player.x, self.player.y))  # Start position.
-
-            # Compute the path to the destination and remove the starting point.
-            path: List[List[int]] = pathfinder.path_to((x, y))[1:].tolist()
-
-            # Convert from List[List[int]] to List[Tuple[int, int]].
-            path = [(index[0], index[1]) for index in path]
+            # Visible tiles are all within the FOV radius, so the search can stay inside it.
+            path = self.player.gamemap.pathfinding.path_to(
+                (self.player.x, self.player.y), (x, y), crowd=False, radius=FOV_RADIUS
+            )
             for xy in path:
                 console.tiles_rgb["bg"][xy[0], xy[1]] = color.white
                 console.tiles_rgb["fg"][xy[0], xy[1]] = color.black
@@ -34,13 +34,18 @@ def main() -> None:
         root_console = tcod.Console(screen_width, screen_height, order="F")
         try:
             while True:
-                root_console.clear()
-                handler.on_render(console=root_console)
-                context.present(root_console)
+                if handler.dirty:
+                    root_console.clear()
+                    handler.on_render(console=root_console)
+                    handler.dirty = False
+                    context.present(root_console)
 
                 try:
-                    for event in tcod.event.wait():
+                    for event in input_handlers.coalesce_events(tcod.event.wait()):
                         context.convert_event(event)
+                        if isinstance(event, tcod.event.WindowEvent):
+                            # Nothing changed, but the window may need the last frame again.
+                            context.present(root_console)
                         handler = handler.handle_events(event)
                         if isinstance(handler, input_handlers.EventHandler):
                             if handler.engine.win:
@@ -48,6 +53,7 @@ def main() -> None:
                         #save_game(handler, "savegame.sav")
                 except Exception:  # Handle exceptions in game.
                     traceback.print_exc()  # Print error to stderr.
+                    handler.dirty = True
                     # Then print the error to the message log.
                     if isinstance(handler, input_handlers.EventHandler):
                         handler.engine.message_log.add_message(
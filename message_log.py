@@ -1,16 +1,52 @@
-from typing import Iterable, List, Reversible, Tuple
+from collections import deque, OrderedDict
+import os
+import shutil
+import struct
+import tempfile
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 import textwrap
+import weakref
 
 import tcod
 
 import color
 
+# How many of the newest messages are kept in memory.  Older ones go to the archive.
+RECENT_MESSAGES = 100
+# How many archived messages are read from disk at a time, and how many of those pages to keep.
+ARCHIVE_PAGE_SIZE = 64
+ARCHIVE_PAGES_CACHED = 4
+
+# An archived message is its color and count followed by its UTF-8 encoded text.
+RECORD_HEADER = struct.Struct("<3BI")
+# The archive index holds the position of every record in the data file.
+RECORD_OFFSET = struct.Struct("<Q")
+
 
 class Message:
+    __slots__ = ("plain_text", "fg", "_count", "_wrapped")
+
     def __init__(self, text: str, fg: Tuple[int, int, int]):
         self.plain_text = text
         self.fg = fg
-        self.count = 1
+        self._count = 1
+        self._wrapped: Dict[int, List[str]] = {}  # Wrapped lines of full_text, by width.
+
+    def __getstate__(self) -> Tuple[str, Tuple[int, int, int], int]:
+        return self.plain_text, self.fg, self._count  # Cheap to rewrap, so don't save that.
+
+    def __setstate__(self, state: Tuple[str, Tuple[int, int, int], int]) -> None:
+        self.plain_text, self.fg, self._count = state
+        self._wrapped = {}
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @count.setter
+    def count(self, value: int) -> None:
+        self._count = value
+        self._wrapped.clear()  # The full text has changed.
 
     @property
     def full_text(self) -> str:
@@ -19,10 +55,198 @@ class Message:
             return f"{self.plain_text} (x{self.count})"
         return self.plain_text
 
+    def wrap(self, width: int) -> List[str]:
+        """Return the full text wrapped to `width`, reusing the result of earlier calls."""
+        lines = self._wrapped.get(width)
+        if lines is None:
+            lines = self._wrapped[width] = list(MessageLog.wrap(self.full_text, width))
+        return lines
+
+
+class MessageArchive:
+    """
+    Append-only storage on disk for the messages which no longer fit in a MessageLog.
+
+    Records go into a data file, and the offset of each record into an index file beside
+    it, so any message can be found without reading the ones before it.  Messages are read
+    back a page at a time, and only a few recently used pages are kept in memory.
+
+    Until the archive is relocated next to a save file it lives in a temporary file, which
+    is deleted along with the archive.
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[str] = None  # Created on the first append.
+        self.count = 0  # Number of archived messages.
+        self.size = 0  # Bytes of records in the data file.
+        self._reset()
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "count": self.count, "size": self.size}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._reset()
+        if self.path is not None and not os.path.exists(self.path):
+            # The archive was deleted, so only the recent messages are left.
+            self.path = None
+            self.count = self.size = 0
+
+    def _reset(self) -> None:
+        self._data_file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        self._pages: "OrderedDict[int, List[Message]]" = OrderedDict()
+        self._remove_temporary: Optional[weakref.finalize] = None
+
+    @property
+    def index_path(self) -> str:
+        return f"{self.path}.idx"
+
+    def _open(self) -> Tuple[BinaryIO, BinaryIO]:
+        """Open the archive files, creating them if needed, and return them."""
+        if self._data_file is None or self._index_file is None:
+            if self.path is None:
+                fd, self.path = tempfile.mkstemp(prefix="message-archive-")
+                os.close(fd)
+                self._remove_temporary = weakref.finalize(self, remove_files, self.path, self.index_path)
+            # Drop anything written after this archive was last saved.
+            for path, size in ((self.path, self.size), (self.index_path, self.count * RECORD_OFFSET.size)):
+                with open(path, "ab") as f:
+                    f.truncate(size)
+            self._data_file = open(self.path, "a+b")
+            self._index_file = open(self.index_path, "a+b")
+        return self._data_file, self._index_file
+
+    def close(self) -> None:
+        for f in (self._data_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._data_file = self._index_file = None
+
+    def append(self, message: Message) -> None:
+        data_file, index_file = self._open()
+        text = message.plain_text.encode("utf-8")
+        record = RECORD_HEADER.pack(*message.fg, message.count) + text
+        data_file.write(record)
+        index_file.write(RECORD_OFFSET.pack(self.size))
+        self._pages.pop(self.count // ARCHIVE_PAGE_SIZE, None)  # That page is now longer.
+        self.size += len(record)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Message:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        page_number, page_index = divmod(index, ARCHIVE_PAGE_SIZE)
+        page = self._pages.get(page_number)
+        if page is None:
+            page = self._read_page(page_number)
+            self._pages[page_number] = page
+            if len(self._pages) > ARCHIVE_PAGES_CACHED:
+                self._pages.popitem(last=False)  # Forget the least recently used page.
+        else:
+            self._pages.move_to_end(page_number)
+        return page[page_index]
+
+    def _read_page(self, page_number: int) -> List[Message]:
+        data_file, index_file = self._open()
+        data_file.flush()
+        index_file.flush()
+        start = page_number * ARCHIVE_PAGE_SIZE
+        stop = min(start + ARCHIVE_PAGE_SIZE, self.count)
+
+        index_file.seek(start * RECORD_OFFSET.size)
+        offset_data = index_file.read((stop - start) * RECORD_OFFSET.size)
+        offsets = [offset for offset, in RECORD_OFFSET.iter_unpack(offset_data)]
+        offsets.append(self._offset_of(stop))
+
+        data_file.seek(offsets[0])
+        data = data_file.read(offsets[-1] - offsets[0])
+
+        page = []
+        for record_start, record_end in zip(offsets, offsets[1:]):
+            record = data[record_start - offsets[0] : record_end - offsets[0]]
+            r, g, b, count = RECORD_HEADER.unpack_from(record)
+            message = Message(record[RECORD_HEADER.size :].decode("utf-8"), (r, g, b))
+            message.count = count
+            page.append(message)
+        return page
+
+    def _offset_of(self, index: int) -> int:
+        """Return where the record at `index` starts, or the end of the data for the last index."""
+        if index == self.count:
+            return self.size
+        self._index_file.seek(index * RECORD_OFFSET.size)
+        return RECORD_OFFSET.unpack(self._index_file.read(RECORD_OFFSET.size))[0]
+
+    def relocate(self, path: str) -> None:
+        """Move the archive to `path`, so that it is kept along with a save file there.
+
+        A temporary archive is moved, an archive belonging to another save is copied.
+        """
+        if self.path is None:
+            self._open()
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            self._data_file.flush()
+            self._index_file.flush()
+            return
+        self.close()
+        if self._remove_temporary is not None and self._remove_temporary.detach():
+            shutil.move(self.path, path)
+            shutil.move(self.index_path, f"{path}.idx")
+            self._remove_temporary = None
+        else:
+            shutil.copyfile(self.path, path)
+            shutil.copyfile(self.index_path, f"{path}.idx")
+        self.path = path
+
+    def make_temporary(self) -> None:
+        """Move an archive kept with a save file back to a temporary file.
+
+        The save's copy is then gone, and the archive is deleted along with this object again.
+        """
+        if self.path is None or self._remove_temporary is not None:
+            return
+        self.close()
+        fd, path = tempfile.mkstemp(prefix="message-archive-")
+        os.close(fd)
+        shutil.move(self.path, path)
+        shutil.move(self.index_path, f"{path}.idx")
+        self.path = path
+        self._remove_temporary = weakref.finalize(self, remove_files, self.path, self.index_path)
+
+
+def remove_files(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
 
 class MessageLog:
+    """
+    The message log.  Only the newest messages are kept in memory and saved with the game,
+    older messages are appended to an archive on disk and read back when needed.
+    """
+
     def __init__(self) -> None:
-        self.messages: List[Message] = []
+        self.messages: Deque[Message] = deque()  # The newest messages.
+        self.archive = MessageArchive()
+
+    def __len__(self) -> int:
+        """The number of messages, including the archived ones."""
+        return self.archive.count + len(self.messages)
+
+    def __getitem__(self, index: int) -> Message:
+        if index < self.archive.count:
+            return self.archive[index]
+        return self.messages[index - self.archive.count]
+
+    def iter_back(self, end: int) -> Iterator[Message]:
+        """Iterate over the messages before index `end`, newest first."""
+        for index in range(end - 1, -1, -1):
+            yield self[index]
 
     def add_message(
         self, text: str, fg: Tuple[int, int, int] = color.white, *, stack: bool = True,
@@ -35,6 +259,9 @@ class MessageLog:
         if stack and self.messages and text == self.messages[-1].plain_text:
             self.messages[-1].count += 1
         else:
+            if len(self.messages) >= RECENT_MESSAGES:
+                # Only the newest message can still change, so older ones are final.
+                self.archive.append(self.messages.popleft())
             self.messages.append(Message(text, fg))
 
     def render(
@@ -44,7 +271,7 @@ class MessageLog:
         `x`, `y`, `width`, `height` is the rectangular region to render onto
         the `console`.
         """
-        self.render_messages(console, x, y, width, height, self.messages)
+        self.render_messages(console, x, y, width, height, reversed(self.messages))
 
     @staticmethod
     def wrap(string: str, width: int) -> Iterable[str]:
@@ -62,16 +289,16 @@ class MessageLog:
         y: int,
         width: int,
         height: int,
-        messages: Reversible[Message],
+        messages: Iterable[Message],
     ) -> None:
         """Render the messages provided.
-        The `messages` are rendered starting at the last message and working
-        backwards.
+        The `messages` are given newest first, and rendered from the bottom of
+        the area upwards.
         """
         y_offset = height - 1
 
-        for message in reversed(messages):
-            for line in reversed(list(cls.wrap(message.full_text, width))):
+        for message in messages:
+            for line in reversed(message.wrap(width)):
                 console.print(x=x, y=y + y_offset, string=line, fg=message.fg)
                 y_offset -= 1
                 if y_offset < 0:
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+import tcod
+
+import tile_types
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+
+# Extra cost of moving into a tile occupied by a blocking entity.
+# A lower number means more enemies will crowd behind each other in
+# hallways.  A higher number means enemies will take longer paths in
+# order to surround the player.
+CROWD_COST = 10
+
+
+class PathService:
+    """
+    Pathfinding for a single GameMap.
+
+    The walkable cost array is cached until the map's tiles change, blocking entities are
+    tracked in a separate occupancy overlay, and the tcod graph and pathfinder are reused
+    between queries instead of being rebuilt for every path.
+    """
+
+    def __init__(self, gamemap: GameMap):
+        self.gamemap = gamemap
+        # Number of blocking entities on each tile, kept up to date by the GameMap.
+        self.occupancy = np.zeros((gamemap.width, gamemap.height), dtype=np.int8, order="F")
+        self.clear_cache()
+
+    def __getstate__(self) -> dict:
+        # tcod graphs can't be pickled, and everything cached is cheap to rebuild.
+        state = self.__dict__.copy()
+        for key in ("tiles_version", "base_cost", "cost", "pathfinder", "window", "window_pathfinder"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        self.tiles_version: Optional[int] = None
+        self.base_cost: Optional[np.ndarray] = None
+        self.cost: Optional[np.ndarray] = None  # Working array the pathfinder's graph refers to.
+        self.pathfinder: Optional[tcod.path.Pathfinder] = None
+        # The (left, top, right, bottom) of the last window searched, and its pathfinder.
+        self.window: Optional[Tuple[int, int, int, int]] = None
+        self.window_pathfinder: Optional[tcod.path.Pathfinder] = None
+
+    def occupy(self, x: int, y: int) -> None:
+        self.occupancy[x, y] += 1
+
+    def vacate(self, x: int, y: int) -> None:
+        self.occupancy[x, y] -= 1
+
+    def get_cost(self, crowd: bool = True) -> np.ndarray:
+        """Fill and return the working cost array.
+
+        If `crowd` is True then tiles occupied by blocking entities cost more to move into.
+        """
+        if self.tiles_version != self.gamemap.tiles_version:
+            self.base_cost = tile_types.walkable[self.gamemap.tiles].astype(np.int8, order="F")
+            self.tiles_version = self.gamemap.tiles_version
+        if self.cost is None:
+            self.cost = np.zeros_like(self.base_cost)
+
+        if crowd:
+            # Same as base_cost + CROWD_COST * occupancy on walkable tiles, without temporaries.
+            np.multiply(self.occupancy, CROWD_COST, out=self.cost)
+            self.cost *= self.base_cost
+            self.cost += self.base_cost
+        else:
+            self.cost[...] = self.base_cost
+
+        return self.cost
+
+    def get_pathfinder(self, crowd: bool = True) -> tcod.path.Pathfinder:
+        """Return the shared pathfinder, cleared and working on a freshly filled cost array."""
+        self.get_cost(crowd)
+        if self.pathfinder is None:
+            graph = tcod.path.SimpleGraph(cost=self.cost, cardinal=2, diagonal=3)
+            self.pathfinder = tcod.path.Pathfinder(graph)
+        else:
+            self.pathfinder.clear()
+        return self.pathfinder
+
+    def get_window_pathfinder(
+        self, window: Tuple[int, int, int, int], crowd: bool = True
+    ) -> tcod.path.Pathfinder:
+        """Return a cleared pathfinder over just the (left, top, right, bottom) window.
+
+        The graph is over a view of the working cost array, so it is reused for as long as
+        the same window is asked for, such as while aiming from the same spot.
+        """
+        cost = self.get_cost(crowd)
+        if self.window_pathfinder is None or self.window != window:
+            left, top, right, bottom = window
+            graph = tcod.path.SimpleGraph(cost=cost[left:right, top:bottom], cardinal=2, diagonal=3)
+            self.window_pathfinder = tcod.path.Pathfinder(graph)
+            self.window = window
+        else:
+            self.window_pathfinder.clear()
+        return self.window_pathfinder
+
+    def path_to(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        *,
+        crowd: bool = True,
+        radius: Optional[int] = None,
+    ) -> List[Tuple[int, int]]:
+        """Compute and return a path from `start` to `goal`, not including `start`.
+
+        If `radius` is given then only tiles within that many steps of `start` are searched.
+        If there is no valid path then returns an empty list.
+        """
+        if radius is None:
+            pathfinder = self.get_pathfinder(crowd)
+            pathfinder.add_root(start)
+            path: List[List[int]] = pathfinder.path_to(goal)[1:].tolist()
+        else:
+            start_x, start_y = start
+            left, top = max(0, start_x - radius), max(0, start_y - radius)
+            right = min(self.gamemap.width, start_x + radius + 1)
+            bottom = min(self.gamemap.height, start_y + radius + 1)
+            if not (left <= goal[0] < right and top <= goal[1] < bottom):
+                return []
+
+            pathfinder = self.get_window_pathfinder((left, top, right, bottom), crowd)
+            pathfinder.add_root((start_x - left, start_y - top))
+            path = (pathfinder.path_to((goal[0] - left, goal[1] - top))[1:] + (left, top)).tolist()
+
+        # Convert from List[List[int]] to List[Tuple[int, int]].
+        return [(index[0], index[1]) for index in path]
+
+    def distance_map(self, roots: Iterable[Tuple[int, int]], *, crowd: bool = True) -> np.ndarray:
+        """Return the cost of reaching every tile from the nearest of `roots`.
+
+        Unreachable tiles hold the maximum value of the array's type.
+        """
+        pathfinder = self.get_pathfinder(crowd)
+        for root in roots:
+            pathfinder.add_root(root)
+        pathfinder.resolve()
+        # The pathfinder's own array is reset by the next query, so hand out a copy.
+        return pathfinder.distance.copy(order="F")
+
+    def travel_path(self, start: Tuple[int, int], goals: np.ndarray) -> List[Tuple[int, int]]:
+        """Return a path from `start` to the nearest walkable tile in the `goals` mask.
+
+        Apart from the goal itself, the path only crosses tiles the player has explored.
+        Entities are ignored.  The path doesn't include `start`, and is empty if there is
+        no way to reach any goal.
+        """
+        explored = self.gamemap.explored
+        walkable = self.get_cost(crowd=False).astype(bool)
+        goals = goals & walkable
+        cost = (walkable & (explored | goals)).astype(np.int8)
+
+        # A Dijkstra map which counts down towards the goals, walked downhill from the start.
+        distance = np.full(cost.shape, np.iinfo(np.int32).max, dtype=np.int32, order="F")
+        distance[goals] = 0
+        tcod.path.dijkstra2d(distance, cost, 2, 3, out=distance)
+        path: List[List[int]] = tcod.path.hillclimb2d(distance, start, True, True)[1:].tolist()
+        return [(index[0], index[1]) for index in path]
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from itertools import accumulate, chain, islice
 import random
 from typing import Dict, Iterator, List, Tuple, TYPE_CHECKING
 
-import tcod
+import numpy as np  # type: ignore
 
+from awareness_states import AwarenessState
 import entity_factories
-from entity import Item
+from entity import Actor, Item
 from game_map import GameMap
 from rarity_levels import RarityLevel
 import tile_types
@@ -52,6 +55,9 @@ item_chances: Dict[int, List[Tuple[Entity, int]]] = {
     10: [(entity_factories.super_health_potion, 2)],
 }
 
+# The chance that a monster is asleep when the floor is generated, rather than idle.
+sleeping_chance = 0.25
+
 enemy_chances: Dict[int, List[Tuple[Entity, int]]] = {
     0: [(entity_factories.orc, 80)],
     3: [(entity_factories.troll, 15)],
@@ -70,44 +76,50 @@ rarity_chances = {
     RarityLevel.SET: 1, 
 }
 
-def get_entities_at_random(
-    weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]],
-    number_of_entities: int,
-    floor: int,
-) -> List[Entity]:
-    entity_weighted_chances = {}
-
-    for key, values in weighted_chances_by_floor.items():
-        if key > floor:
-            break
-        else:
-            for value in values:
-                entity = value[0]
-                weighted_chance = value[1]
-
-                entity_weighted_chances[entity] = weighted_chance
-
-    entities = list(entity_weighted_chances.keys())
-    entity_weighted_chance_values = list(entity_weighted_chances.values())
-
-    chosen_entities = random.choices(
-        entities, weights=entity_weighted_chance_values, k=number_of_entities
-    )
-
-    return chosen_entities
+class SpawnTable:
+    """
+    Weighted chances of spawning each entity, by the floor they start on.
+
+    The chances for a floor are compiled once into a list of entities and their cumulative
+    weights, so each pick is a binary search instead of a rebuild of the whole table.
+    """
+
+    def __init__(self, weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]]):
+        self.weighted_chances_by_floor = weighted_chances_by_floor
+        self.compiled: Dict[int, Tuple[List[Entity], List[int]]] = {}
+
+    def compile(self, floor: int) -> Tuple[List[Entity], List[int]]:
+        """Return the entities which can spawn on `floor`, and their cumulative weights."""
+        if floor not in self.compiled:
+            entity_weighted_chances: Dict[Entity, int] = {}
+            for key, values in sorted(self.weighted_chances_by_floor.items()):
+                if key > floor:
+                    break
+                for entity, weighted_chance in values:
+                    entity_weighted_chances[entity] = weighted_chance
+
+            self.compiled[floor] = (
+                list(entity_weighted_chances.keys()),
+                list(accumulate(entity_weighted_chances.values())),
+            )
+        return self.compiled[floor]
+
+    def sample(self, number_of_entities: int, floor: int, rng: random.Random) -> List[Entity]:
+        """Pick `number_of_entities` entities for `floor` at random."""
+        entities, cum_weights = self.compile(floor)
+        return rng.choices(entities, cum_weights=cum_weights, k=number_of_entities)
+
+item_table = SpawnTable(item_chances)
+enemy_table = SpawnTable(enemy_chances)
 
 def get_max_value_for_floor(
     max_value_by_floor: List[Tuple[int, int]], floor: int
 ) -> int:
-    current_value = 0
-
-    for floor_minimum, value in max_value_by_floor:
-        if floor_minimum > floor:
-            break
-        else:
-            current_value = value
-
-    return current_value
+    """Return the value for the highest floor minimum at or below `floor`, or 0 if none."""
+    index = bisect_right(max_value_by_floor, floor, key=lambda floor_value: floor_value[0])
+    if index == 0:
+        return 0
+    return max_value_by_floor[index - 1][1]
 
 class RectangularRoom:
     def __init__(self, x: int, y: int, width: int, height: int):
@@ -128,6 +140,11 @@ class RectangularRoom:
         """Return the inner area of this room as a 2D array index."""
         return slice(self.x1 + 1, self.x2), slice(self.y1 + 1, self.y2)
 
+    @property
+    def outer(self) -> Tuple[slice, slice]:
+        """Return the whole room, walls included, as a 2D array index."""
+        return slice(self.x1, self.x2 + 1), slice(self.y1, self.y2 + 1)
+
     def intersects(self, other: RectangularRoom) -> bool:
         """Return True if this room overlaps with another RectangularRoom."""
         return (
@@ -137,46 +154,45 @@ class RectangularRoom:
             and self.y2 >= other.y1
         )
 
-def place_entities(room: RectangularRoom, dungeon: GameMap, floor_number: int,) -> None:
-    number_of_monsters = random.randint(
-        0, get_max_value_for_floor(max_monsters_by_floor, floor_number)
-    )
-    number_of_items = random.randint(
-        0, get_max_value_for_floor(max_items_by_floor, floor_number)
-    )
-
-    monsters: List[Entity] = get_entities_at_random(
-        enemy_chances, number_of_monsters, floor_number
-    )
-    items: List[Entity] = get_entities_at_random(
-        item_chances, number_of_items, floor_number
-    )
-
-    for entity in monsters + items:
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
-
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
-            entity.spawn(dungeon, x, y, rarity_chances)
+def place_entities(rooms: List[RectangularRoom], dungeon: GameMap, floor_number: int,) -> None:
+    """Place the monsters and items of every room, picking them all in one go."""
+    rng = dungeon.rng.spawn
+    max_monsters = get_max_value_for_floor(max_monsters_by_floor, floor_number)
+    max_items = get_max_value_for_floor(max_items_by_floor, floor_number)
+    numbers_of_monsters = [rng.randint(0, max_monsters) for _ in rooms]
+    numbers_of_items = [rng.randint(0, max_items) for _ in rooms]
+
+    monsters = iter(enemy_table.sample(sum(numbers_of_monsters), floor_number, rng))
+    items = iter(item_table.sample(sum(numbers_of_items), floor_number, rng))
+
+    for room, number_of_monsters, number_of_items in zip(rooms, numbers_of_monsters, numbers_of_items):
+        for entity in chain(islice(monsters, number_of_monsters), islice(items, number_of_items)):
+            x = rng.randint(room.x1 + 1, room.x2 - 1)
+            y = rng.randint(room.y1 + 1, room.y2 - 1)
+
+            # The player arrives on the up stairs, so keep them clear.
+            if (x, y) != dungeon.upstairs_location and not any(dungeon.get_entities_at_location(x, y)):
+                spawned = entity.spawn(dungeon, x, y, rarity_chances)
+                if isinstance(spawned, Actor) and rng.random() < sleeping_chance:
+                    # Sleeping monsters don't wake when seen, only when hurt or hearing a fight.
+                    spawned.ai.awareness = AwarenessState.SLEEPING
 
 def tunnel_between(
-    start: Tuple[int, int], end: Tuple[int, int]
-) -> Iterator[Tuple[int, int]]:
-    """Return an L-shaped tunnel between these two points."""
+    start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
+) -> Iterator[Tuple[slice, slice]]:
+    """Return an L-shaped tunnel between these two points, as the 2D array index of each leg."""
     x1, y1 = start
     x2, y2 = end
-    if random.random() < 0.5:  # 50% chance.
+    if rng.random() < 0.5:  # 50% chance.
         # Move horizontally, then vertically.
         corner_x, corner_y = x2, y1
     else:
         # Move vertically, then horizontally.
         corner_x, corner_y = x1, y2
 
-    # Generate the coordinates for this tunnel.
-    for x, y in tcod.los.bresenham((x1, y1), (corner_x, corner_y)).tolist():
-        yield x, y
-    for x, y in tcod.los.bresenham((corner_x, corner_y), (x2, y2)).tolist():
-        yield x, y
+    # Both legs are straight lines, so each one is a single slice of the map.
+    for (a_x, a_y), (b_x, b_y) in (((x1, y1), (corner_x, corner_y)), ((corner_x, corner_y), (x2, y2))):
+        yield slice(min(a_x, b_x), max(a_x, b_x) + 1), slice(min(a_y, b_y), max(a_y, b_y) + 1)
 
 def generate_dungeon(
     max_rooms: int,
@@ -185,45 +201,51 @@ def generate_dungeon(
     map_width: int,
     map_height: int,
     engine: Engine,
+    floor: int,
 ) -> GameMap:
-    """Generate a new dungeon map."""
-    player = engine.player
-    dungeon = GameMap(engine, map_width, map_height, entities=[player])
+    """Generate a new dungeon map for the given floor.
+
+    This doesn't touch the player or anything else outside of the new map, so it is safe to
+    run in the background while the game goes on.
+    """
+    dungeon = GameMap(engine, map_width, map_height, floor=floor)
+    dungeon.rng = engine.rng.for_floor(floor)
+    rng = dungeon.rng.map
 
     rooms: List[RectangularRoom] = []
+    # Tiles covered by a room so far, walls included.
+    occupied = np.zeros((map_width, map_height), dtype=bool, order="F")
 
     center_of_last_room = (0, 0)
 
     for r in range(max_rooms):
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
 
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
+        x = rng.randint(0, dungeon.width - room_width - 1)
+        y = rng.randint(0, dungeon.height - room_height - 1)
 
         # "RectangularRoom" class makes rectangles easier to work with
         new_room = RectangularRoom(x, y, room_width, room_height)
 
         center_of_last_room = new_room.center
 
-        # Run through the other rooms and see if they intersect with this one.
-        if any(new_room.intersects(other_room) for other_room in rooms):
+        # Check whether this room would intersect any of the other rooms.
+        if occupied[new_room.outer].any():
             continue  # This room intersects, so go to the next attempt.
+        occupied[new_room.outer] = True
         # If there are no intersections then the room is valid.
 
         # Dig out this rooms inner area.
         dungeon.tiles[new_room.inner] = tile_types.floor
 
         if len(rooms) == 0:
-            # The first room, where the player starts.
-            player.place(*new_room.center, dungeon)
+            # The first room, where the player arrives.
             up_stairs=center_of_last_room
         else:  # All rooms after the first.
             # Dig out a tunnel between this room and the previous one.
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
-
-        place_entities(new_room, dungeon, engine.game_world.current_floor)
+            for tunnel in tunnel_between(rooms[-1].center, new_room.center, rng):
+                dungeon.tiles[tunnel] = tile_types.floor
 
         dungeon.tiles[center_of_last_room] = tile_types.down_stairs
         dungeon.downstairs_location = center_of_last_room
@@ -233,4 +255,9 @@ def generate_dungeon(
         # Finally, append the new room to the list.
         rooms.append(new_room)
 
+    place_entities(rooms, dungeon, floor)
+
+    dungeon.tiles_changed()
+    dungeon.rng = None  # Only needed while generating.
+
     return dungeon
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import random
+from typing import Optional, Union
+
+
+def new_stream(seed: Union[int, str], name: str) -> random.Random:
+    """Return a generator seeded from a seed and the name of the stream."""
+    return random.Random(f"{seed}:{name}")
+
+
+class RandomStreams:
+    """
+    Independent random number generators, all derived from a single seed.
+
+    Each part of the game draws from its own stream, so games with the same seed play out
+    the same way, and a fight going differently doesn't change the layout of the next floor.
+    The engine owns these streams, which are drawn from while the game is played.  Every
+    floor is generated from its own `FloorStreams` (see `for_floor`), so floors come out the
+    same no matter when, or on which thread, they are generated.
+    """
+
+    def __init__(self, seed: Optional[Union[int, str]] = None):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+
+        self.combat = new_stream(seed, "combat")  # Damage rolls and teleports.
+        self.ai = new_stream(seed, "ai")  # Confused monsters stumbling around.
+
+    def for_floor(self, floor: int) -> FloorStreams:
+        """Return the streams used to generate the given floor."""
+        return FloorStreams(f"{self.seed}:floor {floor}")
+
+
+class FloorStreams:
+    """The random number generators a floor is generated from, owned by its GameMap while it's generated."""
+
+    def __init__(self, seed: str):
+        self.map = new_stream(seed, "map")  # Room and tunnel layout.
+        self.spawn = new_stream(seed, "spawn")  # Which monsters and items appear, and where.
+        self.loot = new_stream(seed, "loot")  # Item rarity, item level and enchants.
@@ -14,9 +14,7 @@ def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
     if not game_map.in_bounds(x, y) or not game_map.visible[x, y]:
         return ""
 
-    names = ", ".join(
-        entity.name for entity in game_map.entities if entity.x == x and entity.y == y
-    )
+    names = ", ".join(game_map.get_names_at_location(x, y))
 
     return names.capitalize()
 
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+
+class RenderLayer:
+    """
+    The entities drawn at one RenderOrder, along with arrays of their positions and glyphs.
+
+    The arrays are kept up to date as entities are added, moved and removed, so drawing the
+    layer doesn't have to visit every entity.  Rows are kept packed: the first `len(layer)`
+    rows are in use, and removing an entity moves the last row into its place.
+
+    An entity's char and color are read when it is added, so an entity which changes how it
+    looks has to be removed and added again.
+    """
+
+    def __init__(self) -> None:
+        self.entities: List[Entity] = []
+        self.rows: Dict[Entity, int] = {}  # The row of each entity in the arrays.
+        self.positions = np.zeros((0, 2), dtype=np.intp)
+        self.chars = np.zeros(0, dtype=np.int32)
+        self.colors = np.zeros((0, 3), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity in self.rows
+
+    def __iter__(self) -> Iterator[Entity]:
+        return iter(self.entities)
+
+    def add(self, entity: Entity) -> None:
+        """Add an entity to this layer, unless it is already in it."""
+        if entity in self.rows:
+            return
+        row = len(self.entities)
+        if row == len(self.chars):
+            self.grow()
+        self.entities.append(entity)
+        self.rows[entity] = row
+        self.positions[row] = entity.x, entity.y
+        self.chars[row] = ord(entity.char)
+        self.colors[row] = entity.color
+
+    def discard(self, entity: Entity) -> None:
+        """Remove an entity from this layer, if it is in it."""
+        row = self.rows.pop(entity, None)
+        if row is None:
+            return
+        last_row = len(self.entities) - 1
+        last = self.entities.pop()
+        if row != last_row:
+            # Fill the gap with the last row.
+            self.entities[row] = last
+            self.rows[last] = row
+            self.positions[row] = self.positions[last_row]
+            self.chars[row] = self.chars[last_row]
+            self.colors[row] = self.colors[last_row]
+
+    def move(self, entity: Entity, x: int, y: int) -> None:
+        """Update the position of an entity in this layer."""
+        self.positions[self.rows[entity]] = x, y
+
+    def grow(self) -> None:
+        """Double the number of rows in the arrays."""
+        size = len(self.entities)
+        capacity = max(8, size * 2)
+        for name in ("positions", "chars", "colors"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:size] = old[:size]
+            setattr(self, name, new)
@@ -3,7 +3,6 @@ from __future__ import annotations
 import random
 from os import walk
 
-import copy
 import lzma
 import pickle
 import traceback
@@ -23,8 +22,12 @@ import input_handlers
 background_images = next(walk("images/backgrounds"), (None, None, []))[2]
 background_image = tcod.image.load("images/backgrounds/" + random.choice(background_images))[:, :, :3]
 
-def new_game() -> Engine:
-    """Return a brand new game session as an Engine instance."""
+def new_game(seed: Optional[int] = None, pregenerate_floors: bool = True) -> Engine:
+    """Return a brand new game session as an Engine instance.
+
+    Games started with the same `seed` play out the same way.  Unless `pregenerate_floors` is
+    False the next floor down is always being generated in the background.
+    """
     map_width = 80
     map_height = 43
 
@@ -32,9 +35,9 @@ def new_game() -> Engine:
     room_min_size = 6
     max_rooms = 30
 
-    player = copy.deepcopy(entity_factories.player)
+    player = entity_factories.player.clone()
 
-    engine = Engine(player=player)
+    engine = Engine(player=player, seed=seed)
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -43,19 +46,22 @@ def new_game() -> Engine:
         room_max_size=room_max_size,
         map_width=map_width,
         map_height=map_height,
+        pregenerate_floors=pregenerate_floors,
     )
     
     engine.game_world.generate_floor()
     engine.game_map = engine.game_world.game_maps[1]
+    player.place(*engine.game_map.upstairs_location, engine.game_map)
+    engine.game_world.pregenerate(2)
     engine.update_fov()
 
     engine.message_log.add_message(
         "I HOPE YOU LIKE LOOT", color.welcome_text
     )
 
-    dagger = copy.deepcopy(entity_factories.dagger)
+    dagger = entity_factories.dagger.clone()
     dagger.equippable.rarity = RarityLevel.COMMON
-    leather_armor = copy.deepcopy(entity_factories.leather_armor)
+    leather_armor = entity_factories.leather_armor.clone()
     leather_armor.equippable.rarity = RarityLevel.COMMON
 
     dagger.parent = player.inventory
@@ -74,6 +80,8 @@ def load_game(filename: str) -> Engine:
     with open(filename, "rb") as f:
         engine = pickle.loads(lzma.decompress(f.read()))
     assert isinstance(engine, Engine)
+    # The floor being generated in the background isn't saved, so start on it again.
+    engine.game_world.pregenerate(engine.game_world.current_floor + 1)
     return engine
 
 class MainMenu(input_handlers.BaseEventHandler):
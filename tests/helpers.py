@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from engine import Engine
+import entity_factories
+from game_map import GameMap
+import tile_types
+
+
+def new_room(width: int = 40, height: int = 40) -> Tuple[Engine, GameMap]:
+    """Return an engine whose map is one open room, with the player standing in the middle."""
+    player = entity_factories.player.clone()
+    engine = Engine(player=player, seed=1)
+    game_map = GameMap(engine, width, height)
+    game_map.tiles[1:-1, 1:-1] = tile_types.floor
+    game_map.tiles_changed()
+    game_map.visible[:] = True
+    engine.game_map = game_map
+    player.place(width // 2, height // 2, game_map)
+    return engine, game_map
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import entity_factories
+from helpers import new_room
+
+
+def test_crowd_only_closes_in() -> None:
+    """A crowd chasing a player who stands still never backs off or steps back and forth."""
+    engine, game_map = new_room()
+    player = engine.player
+    player.fighter._max_hp = player.fighter._hp = 10 ** 9  # Outlast the whole crowd.
+    game_map.rng = engine.rng.for_floor(1)
+    spots = [(x, y) for x in range(3, 37, 2) for y in (3, 36)]
+    spots += [(x, y) for y in range(5, 35, 2) for x in (3, 36)]
+    orcs = [entity_factories.orc.spawn(game_map, x, y, None) for x, y in spots[:25]]
+    game_map.rng = None
+    for orc in orcs:
+        orc.ai.wake()
+
+    history: List[List[Tuple[int, int]]] = [[(orc.x, orc.y)] for orc in orcs]
+    for _ in range(60):
+        engine.handle_enemy_turns()
+        for orc, tiles in zip(orcs, history):
+            if (orc.x, orc.y) == tiles[-1]:
+                continue
+            old_x, old_y = tiles[-1]
+            old_distance = max(abs(old_x - player.x), abs(old_y - player.y))
+            new_distance = max(abs(orc.x - player.x), abs(orc.y - player.y))
+            assert new_distance <= old_distance
+            assert len(tiles) < 2 or tiles[-2] != (orc.x, orc.y)
+            tiles.append((orc.x, orc.y))
+
+    # And the crowd does reach the player.
+    assert sum(1 for orc in orcs if max(abs(orc.x - player.x), abs(orc.y - player.y)) == 1) == 8
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import entity_factories
+from helpers import new_room
+from input_handlers import MAX_REST_TURNS, MainGameEventHandler
+
+
+def test_rest_until_healed() -> None:
+    """Resting from nearly dead regenerates all HP and MP within a single rest command."""
+    engine, game_map = new_room()
+    fighter = engine.player.fighter
+    fighter.hp = 1
+    fighter.mp = 0
+
+    handler = MainGameEventHandler(engine)
+    turns = 0
+    for action in handler.rest():
+        assert handler.handle_action(action)
+        turns += 1
+
+    assert fighter.hp == fighter.max_hp
+    assert fighter.mp == fighter.max_mp
+    assert turns <= MAX_REST_TURNS
+
+
+def test_rest_stops_when_a_monster_shows_up() -> None:
+    engine, game_map = new_room()
+    player = engine.player
+    player.fighter.hp = 1
+
+    handler = MainGameEventHandler(engine)
+    turns = 0
+    for action in handler.rest():
+        assert handler.handle_action(action)
+        turns += 1
+        if turns == 5:
+            game_map.rng = engine.rng.for_floor(1)
+            entity_factories.orc.spawn(game_map, player.x + 3, player.y, None)
+            game_map.rng = None
+
+    assert turns == 5
+    assert player.fighter.hp < player.fighter.max_hp
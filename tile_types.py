@@ -22,18 +22,47 @@ tile_dt = np.dtype(
 )
 
 
+# SHROUD represents unexplored, unseen tiles
+SHROUD = np.array((ord(" "), (255, 255, 255), (0, 0, 0)), dtype=graphic_dt)
+
+# Every tile type defined so far, indexed by tile id.  Maps store only these ids.
+tile_data = np.zeros(0, dtype=tile_dt)
+
+# Contiguous lookup tables indexed by tile id, rebuilt whenever a tile type is added.
+# Index them with a map's tiles array, e.g. `tile_types.walkable[game_map.tiles]`.
+walkable = tile_data["walkable"]
+transparent = tile_data["transparent"]
+dark = tile_data["dark"]
+light = tile_data["light"]
+graphics = np.zeros((3, 0), dtype=graphic_dt)  # Indexed by [SHROUD/dark/light, tile id].
+
+
 def new_tile(
     *,  # Enforce the use of keywords, so that parameter order doesn't matter.
     walkable: int,
     transparent: int,
     dark: Tuple[int, Tuple[int, int, int], Tuple[int, int, int]],
     light: Tuple[int, Tuple[int, int, int], Tuple[int, int, int]],
-) -> np.ndarray:
-    """Helper function for defining individual tile types """
-    return np.array((walkable, transparent, dark, light), dtype=tile_dt)
+) -> int:
+    """Helper function for defining individual tile types, returns the new tile's id."""
+    global tile_data
+    tile_id = len(tile_data)
+    if tile_id > np.iinfo(np.uint8).max:
+        raise ValueError("Too many tile types to fit in a uint8 tile id.")
+    tile = np.array((walkable, transparent, dark, light), dtype=tile_dt)
+    tile_data = np.append(tile_data, tile)
+    _build_tables()
+    return tile_id
+
+
+def _build_tables() -> None:
+    global walkable, transparent, dark, light, graphics
+    walkable = np.ascontiguousarray(tile_data["walkable"])
+    transparent = np.ascontiguousarray(tile_data["transparent"])
+    dark = np.ascontiguousarray(tile_data["dark"])
+    light = np.ascontiguousarray(tile_data["light"])
+    graphics = np.stack([np.full(len(tile_data), SHROUD), dark, light])
 
-# SHROUD represents unexplored, unseen tiles
-SHROUD = np.array((ord(" "), (255, 255, 255), (0, 0, 0)), dtype=graphic_dt)
 floor = new_tile(
     walkable=True,
     transparent=True,
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+# An actor with this speed takes exactly one action per ACTION_TIME.
+NORMAL_SPEED = 100
+ACTION_TIME = 100
+
+
+def time_per_action(actor: Actor) -> int:
+    """Return how much game time a single action takes for this actor."""
+    return max(1, ACTION_TIME * NORMAL_SPEED // actor.speed)
+
+
+class TurnScheduler:
+    """
+    Orders the turns of the actors on a map by the game time of their next action.
+
+    Only the actors that have been added are kept, so a turn costs time proportional to
+    the actors that actually act.  Ties are broken by the order actors were scheduled.
+    """
+
+    def __init__(self) -> None:
+        self.time = 0
+        self.sequence = 0
+        self.queue: List[list] = []  # Heap of [time, sequence, actor] entries.
+        self.entries: Dict[Actor, list] = {}
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, actor: Actor, time: Optional[int] = None) -> None:
+        """Schedule the next action of an actor, by default at the current time."""
+        self.remove(actor)
+        entry = [self.time if time is None else time, self.sequence, actor]
+        self.sequence += 1
+        self.entries[actor] = entry
+        heapq.heappush(self.queue, entry)
+
+    def remove(self, actor: Actor) -> None:
+        """Unschedule an actor.  Its queue entry is dropped lazily when it comes up."""
+        entry = self.entries.pop(actor, None)
+        if entry:
+            entry[-1] = None
+
+    def advance(self, duration: int) -> Iterator[Actor]:
+        """
+        Move the clock forward by `duration`, yielding each actor whose action comes due.
+
+        An actor is rescheduled before it is yielded, so it may safely be removed while it acts.
+        """
+        end = self.time + duration
+        while self.queue and self.queue[0][0] < end:
+            time, _, actor = heapq.heappop(self.queue)
+            if actor is None:
+                continue  # This actor was removed.
+            self.time = time
+            self.add(actor, time + time_per_action(actor))
+            yield actor
+
+        self.time = end